@@ -2,29 +2,85 @@
 # NYT SCRAPER - Simple New York Times Article URL Extractor
 # =====================================================================
 # This is a basic script that finds and prints all article URLs
-# from the New York Times homepage using the newspaper library
+# from the New York Times homepage (one homepage download, no per-article requests)
 # =====================================================================
 
+import asyncio                             # For running the async homepage download
+from urllib.parse import urljoin           # For turning relative links into full URLs
+
 # Import the newspaper library - this helps us automatically find articles on news websites
 import newspaper                           # Library that can automatically discover articles on news sites
 
+try:
+    # Optional fast path: async HTTP client + C-based HTML parser
+    import aiohttp                         # Async HTTP client for the homepage download
+    from selectolax.parser import HTMLParser  # Fast HTML parser for pulling out links
+except Exception:                          # If either is missing, we fall back to newspaper
+    aiohttp = None
+    HTMLParser = None
+
+HOMEPAGE = "https://www.nytimes.com"       # The website we want to analyze
+ARTICLE_PREFIX = HOMEPAGE + "/20"          # NYT article URLs start with the year, e.g. /2024/05/01/...
+
+async def fetch_homepage(url):
+    """
+    Download the homepage HTML once using aiohttp
+    
+    Args:
+        url: The homepage URL to download
+    
+    Returns:
+        The HTML content of the page, or None if it failed
+    """
+    timeout = aiohttp.ClientTimeout(total=10)  # Don't wait more than 10 seconds
+    headers = {"User-Agent": "Mozilla/5.0"}    # Look like a real browser
+    try:
+        async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+            async with session.get(url) as resp:   # Send the GET request
+                if resp.status != 200:         # If the server didn't respond with success (e.g. 403)
+                    return None
+                return await resp.text(errors="replace")  # Return the HTML as text
+    except (aiohttp.ClientError, asyncio.TimeoutError):  # Network error or too slow
+        return None
+
+def article_urls_from_homepage(html):
+    """
+    Collect unique article URLs from the homepage HTML
+    
+    Args:
+        html: The HTML content of the homepage
+    
+    Returns:
+        List of article URLs, in the order they appear on the page
+    """
+    tree = HTMLParser(html)                    # Parse the HTML
+    hrefs = (urljoin(HOMEPAGE, a.attributes.get("href") or "") for a in tree.css("a[href]"))  # Full link URLs
+    # dict.fromkeys removes duplicates while keeping the page order
+    return list(dict.fromkeys(h for h in hrefs if h.startswith(ARTICLE_PREFIX)))
+
 def main():
     """
     The main function that does all the work of finding NYT article URLs
     This function will run when we execute this script
     """
-    # Step 1: Create a newspaper "source" object for the New York Times website
-    # This tells the newspaper library to analyze nytimes.com and find all articles
-    nytimes_paper = newspaper.build('https://www.nytimes.com', memoize_articles=False)
+    # Fast path: download the homepage once and read its links (no per-article downloads)
+    if aiohttp is not None and HTMLParser is not None:
+        html = asyncio.run(fetch_homepage(HOMEPAGE))  # Download the homepage HTML
+        if html is not None:                   # If the download failed, let newspaper try below
+            for url in article_urls_from_homepage(html):  # Loop through each article URL found
+                print(url)                     # Print the URL of this article to the console
+            return
+    
+    # Fallback: let the newspaper library discover articles (using its internal thread pool)
+    nytimes_paper = newspaper.build(HOMEPAGE, memoize_articles=False, number_threads=16, request_timeout=10)
     # newspaper.build() - Creates a source object that finds articles on a website
-    # 'https://www.nytimes.com' - The website we want to analyze
     # memoize_articles=False - Don't cache articles (always get fresh ones)
+    # number_threads=16 - Download pages in parallel instead of one by one
+    # request_timeout=10 - Give up on slow pages after 10 seconds
     
-    # Step 2: Loop through each article that the newspaper library found
-    # and print its URL to the screen
+    # Loop through each article that the newspaper library found and print its URL
     for article in nytimes_paper.articles:    # Loop through each article object found
         print(article.url)                    # Print the URL of this article to the console
-        # article.url - Gets the web address (URL) of each article
 
 # This is a standard Python pattern that runs main() only when script is executed directly
 if __name__ == "__main__":                    # This condition checks if script is run directly (not imported)
@@ -33,8 +89,8 @@ if __name__ == "__main__":                    # This condition checks if script
 # =====================================================================
 # WHAT THIS SCRIPT DOES:
 # 
-# 1. Connects to the New York Times website (nytimes.com)
-# 2. Automatically discovers all article links on the homepage
+# 1. Downloads the New York Times homepage (nytimes.com) once
+# 2. Collects all article links on the homepage (falls back to newspaper if aiohttp/selectolax are missing)
 # 3. Prints each article URL to the screen
 # 4. That's it! Simple and straightforward.
 # 
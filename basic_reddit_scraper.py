@@ -7,16 +7,191 @@
 
 # Import the libraries we need for web scraping and HTML parsing
 import requests                        # For making HTTP requests to download web pages
-from bs4 import BeautifulSoup         # For parsing HTML content and finding specific elements
+from requests.adapters import HTTPAdapter  # For connection pooling (reuse open connections)
+from bs4 import BeautifulSoup, SoupStrainer  # For parsing HTML content and finding specific elements
 import time                            # For adding delays between requests (to be polite to servers)
+import asyncio                         # For running many downloads at the same time (overlapping network waits)
+import threading                       # For the thread-safe rate limiter
+from types import MappingProxyType     # For a read-only headers dictionary
+from concurrent.futures import ThreadPoolExecutor  # For parallel downloads when aiohttp isn't installed
 
-def get_subreddit_posts(url, headers):
+try:
+    # Retry utilities for the pooled session
+    from urllib3.util.retry import Retry
+except Exception:
+    Retry = None
+
+try:
+    # Optional C-backed HTML parser; much faster than BeautifulSoup for simple attribute/text lookups
+    from selectolax.parser import HTMLParser
+except Exception:                      # If not installed, we use BeautifulSoup below
+    HTMLParser = None
+
+try:
+    # Optional fast C-based HTML parser; BeautifulSoup uses it when available
+    import lxml                        # noqa: F401 (only checked for presence)
+    HTML_PARSER = "lxml"               # 3-10x faster than the pure-Python parser
+except Exception:                      # If not installed, use Python's built-in parser
+    HTML_PARSER = "html.parser"
+
+try:
+    # Optional dependency for concurrent downloads; we fall back to plain requests if missing
+    import aiohttp                     # Async HTTP client used by the batched fetcher below
+except Exception:                      # If not installed, fetch_all() downloads one page at a time
+    aiohttp = None
+
+# Settings for the batched (async) fetcher
+FETCH_TIMEOUT = 20                     # Seconds to wait for a single page before giving up
+FETCH_MAX_RETRIES = 3                  # How many times to try a page before giving up
+FETCH_PER_HOST = 8                     # Max simultaneous requests to the same website (be polite)
+FETCH_RATE_PER_SEC = 8                 # Max requests per second to the same website (be polite)
+
+REDDIT_BASE = "https://old.reddit.com"  # Prefix for the relative post permalinks Reddit gives us
+
+# Only build the parts of the page we actually read (skips ~90% of the HTML tree)
+POST_STRAINER = SoupStrainer(["div", "span"], attrs={"class": ["thing", "next-button"]})  # Posts + next-page button
+COMMENT_STRAINER = SoupStrainer("div", attrs={"class": ["entry", "usertext-body"]})        # Comment containers + bodies
+
+# HTTP headers to make our requests look like they come from a real browser
+# Read-only so no function can accidentally change them for everyone else
+DEFAULT_HEADERS = MappingProxyType({"User-Agent": "Mozilla/5.0"})  # Pretend to be Mozilla Firefox browser
+
+# One shared HTTP session for all synchronous requests
+# Reusing it keeps TCP+TLS connections open (keep-alive) instead of reconnecting for every page
+SESSION = requests.Session()
+SESSION.headers.update(DEFAULT_HEADERS)  # Attach the browser headers once, not on every call
+if Retry is not None:                  # Retry transient server errors at the connection-pool level
+    _adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                           max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504), allowed_methods=("GET",),
+                                             raise_on_status=False))  # Out of retries: hand back the last response, don't raise
+else:
+    _adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+class RateLimiter:
+    """
+    Limiter that spaces requests out to at most `rate` per second, for threads (wait)
+    or coroutines (await_turn) - replaces fixed sleeps between requests
+    """
+    def __init__(self, rate):
+        self.interval = 1.0 / rate             # Minimum gap between two requests (seconds)
+        self.next_time = time.monotonic()      # Earliest time the next request may start
+        self.lock = threading.Lock()           # Only one caller reserves a time slot at a time
+
+    def _reserve(self):
+        """
+        Reserve the next free time slot and return how long to wait for it (seconds)
+        """
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_time)    # Our slot is now, or right after the last reserved one
+            self.next_time = slot + self.interval  # Push the next slot forward
+        return slot - now                      # How long until our slot starts
+
+    def wait(self):
+        """
+        Block until this thread is allowed to send its request
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)                  # Sleep outside the lock so other threads can reserve slots
+
+    async def await_turn(self):
+        """
+        Pause this coroutine (without blocking the others) until it may send its request
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)         # Other downloads keep running while we wait
+
+async def _get_text(session, url):
+    """
+    Send one GET request and return (status code, body text)
+    """
+    async with session.get(url) as resp:       # Send the GET request over the pooled session
+        return resp.status, await resp.text(errors="replace")  # Read the whole body as text
+
+async def afetch(session, url, sem, limiter=None, timeout=FETCH_TIMEOUT, max_retries=FETCH_MAX_RETRIES):
+    """
+    Download one page inside an aiohttp session, with a concurrency cap and retries
+    
+    Args:
+        session: The shared aiohttp.ClientSession (keeps connections open between requests)
+        url: The page URL to download
+        sem: asyncio.Semaphore that limits how many downloads run at once
+        limiter: Optional RateLimiter that caps requests per second
+        timeout: Seconds to wait for this page before giving up
+        max_retries: How many times to try before giving up
+    
+    Returns:
+        The HTML text of the page, or None if every attempt failed
+    """
+    for attempt in range(max_retries):         # Try a few times in case of temporary network issues
+        try:
+            async with sem:                    # Wait for a free download slot
+                if limiter is not None:        # Also respect the requests-per-second cap
+                    await limiter.await_turn()
+                status, text = await asyncio.wait_for(_get_text(session, url), timeout)  # Bounded total time
+            if status == 200:                  # If the server responded with success
+                return text                    # Return the HTML content
+            if status != 429 and status < 500: # Other client errors (404, 403...) won't fix themselves
+                return None                    # Give up on this page right away
+        except Exception:                      # Network error, timeout, etc.
+            pass                               # Ignore and try again
+        await asyncio.sleep(0.5 * (2 ** attempt))  # Exponential backoff: 0.5s, 1s, 2s...
+    return None                                # Every attempt failed
+
+async def _gather_all(urls):
+    """
+    Download all URLs concurrently over one pooled aiohttp session
+    
+    Args:
+        urls: List of page URLs to download
+    
+    Returns:
+        List of HTML strings (or None for failures), in the same order as urls
+    """
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=FETCH_PER_HOST, ttl_dns_cache=300)  # Pooled connections
+    timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT)  # Upper bound per request
+    sem = asyncio.Semaphore(FETCH_PER_HOST)    # All our URLs are on reddit.com, so cap at the per-host limit
+    limiter = RateLimiter(FETCH_RATE_PER_SEC)  # ...and pace them to a few requests per second
+    async with aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, timeout=timeout) as session:
+        return await asyncio.gather(*[afetch(session, u, sem, limiter) for u in urls])  # Run all downloads together
+
+def fetch_all(urls):
+    """
+    Download many pages at once and return their HTML in the same order
+    
+    Args:
+        urls: List of page URLs to download
+    
+    Returns:
+        List of HTML strings (or None for pages that failed)
+    """
+    if not urls:                               # Nothing to download
+        return []
+    if aiohttp is None:                        # No async client installed: use a thread pool instead
+        limiter = RateLimiter(FETCH_RATE_PER_SEC)  # Cap requests/second to Reddit across all threads
+
+        def fetch_one(u):
+            limiter.wait()                     # Wait for our turn (rate limit)
+            try:
+                r = SESSION.get(u, timeout=FETCH_TIMEOUT)
+                return r.text if r.status_code == 200 else None
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=16) as ex:  # Up to 16 downloads in flight
+            return list(ex.map(fetch_one, urls))  # Results come back in the same order as urls
+    return asyncio.run(_gather_all(urls))  # Run the async downloads from normal (sync) code
+
+def get_subreddit_posts(url):
     """
     Extract post URLs and next page link from a single subreddit page
     
     Args:
         url: The subreddit page URL to scrape
-        headers: HTTP headers to send with the request (to look like a real browser)
     
     Returns:
         A tuple containing:
@@ -24,19 +199,26 @@ def get_subreddit_posts(url, headers):
         - URL for the next page (or None if no next page)
     """
     # Step 1: Download the subreddit page HTML
-    response = requests.get(url, headers=headers)  # Send HTTP GET request to download the page
-    soup = BeautifulSoup(response.text, 'html.parser')  # Parse the HTML into a searchable structure
+    response = SESSION.get(url, timeout=FETCH_TIMEOUT)  # Download the page over the pooled session
+    
+    # Fast path: selectolax reads the attributes straight from C-backed nodes (no Python tree)
+    if HTMLParser is not None:                 # If selectolax is installed
+        tree = HTMLParser(response.text)       # Parse the page once
+        post_urls = [REDDIT_BASE + n.attributes["data-permalink"]  # Build complete post URLs
+                     for n in tree.css("div.thing[data-permalink]") if n.attributes.get("data-permalink")]
+        next_link = tree.css_first("span.next-button a")  # The link inside the "next" button (if any)
+        next_url = next_link.attributes.get("href") if next_link else None  # URL for the next page
+        return post_urls, next_url             # Return tuple: (list of post URLs, next page URL or None)
+    
+    # Fallback: BeautifulSoup
+    soup = BeautifulSoup(response.text, HTML_PARSER, parse_only=POST_STRAINER)  # Parse only post/next-button tags
     
     # Step 2: Find all post containers on the page
     post_divs = soup.find_all("div", class_="thing")  # Find all div elements with class "thing" (Reddit's post containers)
-    post_urls = []                             # Initialize empty list to store post URLs
     
-    # Step 3: Extract the URL for each post
-    for post in post_divs:                     # Loop through each post container we found
-        permalink = post.get("data-permalink")  # Get the permalink attribute (Reddit's unique post path)
-        if permalink:                          # If this post has a valid permalink
-            full_url = "https://old.reddit.com" + permalink  # Build the complete URL by adding Reddit's domain
-            post_urls.append(full_url)         # Add this complete URL to our list
+    # Step 3: Build the full URL for each post that has a permalink (Reddit's unique post path)
+    permalinks = (post.get("data-permalink") for post in post_divs)  # Permalink attribute of each post (or None)
+    post_urls = [REDDIT_BASE + p for p in permalinks if p]  # Add Reddit's domain to every valid permalink
     
     # Step 4: Look for the "next" button to get more pages
     next_button = soup.find("span", class_="next-button")  # Find the next page button element
@@ -60,8 +242,6 @@ def deep_scrape_subreddit(start_url, max_pages=3):
     Returns:
         Combined list of all post URLs found across all pages
     """
-    # Set up HTTP headers to make our requests look like they come from a real browser
-    headers = {"User-Agent": "Mozilla/5.0"}    # Pretend to be Mozilla Firefox browser
     all_posts = []                             # Initialize list to store all posts from all pages
     url = start_url                            # Start with the first page URL
     pages = 0                                  # Counter to track how many pages we've processed
@@ -71,7 +251,7 @@ def deep_scrape_subreddit(start_url, max_pages=3):
         print(f"Scraping page: {url}")         # Show which page we're currently scraping
         
         # Get posts from this page and the URL for the next page
-        posts, next_url = get_subreddit_posts(url, headers)  # Call our function to scrape this page
+        posts, next_url = get_subreddit_posts(url)  # Call our function to scrape this page
         all_posts.extend(posts)                # Add all posts from this page to our master list
         url = next_url                         # Update URL to the next page (or None if no next page)
         pages += 1                             # Increment our page counter
@@ -79,27 +259,45 @@ def deep_scrape_subreddit(start_url, max_pages=3):
     
     return all_posts                           # Return all post URLs we collected from all pages
 
-def scrape_post_comments(post_url, headers):
+def scrape_post_comments(post_url):
     """
     Extract comment texts from a specific Reddit post
     
     Args:
         post_url: The URL of the Reddit post to scrape comments from
-        headers: HTTP headers to send with the request
     
     Returns:
         List of comment text strings found on the post
     """
-    # Step 1: Download the individual post page
-    response = requests.get(post_url, headers=headers)  # Send HTTP request to get the post page
-    soup = BeautifulSoup(response.text, 'html.parser')  # Parse the HTML into searchable structure
+    # Download the individual post page, then pull the comments out of it
+    response = SESSION.get(post_url, timeout=FETCH_TIMEOUT)  # Download the post page over the pooled session
+    return parse_post_comments(response.text)  # Extract comment texts from the HTML
+
+def parse_post_comments(html):
+    """
+    Extract comment texts from the HTML of a Reddit post page
+    
+    Args:
+        html: The HTML content of an old.reddit.com post page
     
-    # Step 2: Find all comment containers on the page
+    Returns:
+        List of comment text strings found on the post
+    """
+    # Fast path: selectolax finds each comment body inside its comment container in C
+    if HTMLParser is not None:                 # If selectolax is installed
+        tree = HTMLParser(html)                # Parse the page once
+        texts = (n.text(strip=True) for n in tree.css("div.entry div.usertext-body"))  # Comment texts
+        return [t for t in texts if t]         # Keep only non-empty comments
+    
+    # Fallback: BeautifulSoup
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=COMMENT_STRAINER)  # Parse only comment tags
+    
+    # Step 1: Find all comment containers on the page
     # In old Reddit, each comment is contained within a <div class="entry">
     comments = soup.find_all("div", class_="entry")  # Find all div elements with class "entry" (comment containers)
     comment_texts = []                         # Initialize empty list to store comment texts
     
-    # Step 3: Extract text from each comment
+    # Step 2: Extract text from each comment
     for comment in comments:                   # Loop through each comment container
         # Look for the actual comment text within this container
         comment_body = comment.find("div", class_="usertext-body")  # Find div with class "usertext-body" (actual comment text)
@@ -117,19 +315,21 @@ def main():
     """
     # Step 1: Set up the starting parameters
     start_url = "https://old.reddit.com/r/nyc/"  # The URL for the NYC subreddit (using old Reddit interface)
-    headers = {"User-Agent": "Mozilla/5.0"}    # HTTP headers to make our request look like a real browser
     print("Starting deep scrape of r/nyc ...")  # Inform user that we're beginning the scraping process
     
     # Step 2: Scrape multiple pages of the subreddit to get post URLs
     posts = deep_scrape_subreddit(start_url, max_pages=3)  # Get posts from up to 3 pages
     print(f"Found {len(posts)} post URLs.")    # Show how many post URLs we discovered
     
-    # Step 3: Process each post to get its comments
-    for post in posts:                         # Loop through each post URL we found
+    # Step 3: Download every post page at once (concurrently), instead of one at a time
+    pages = fetch_all(posts)          # List of HTML strings, same order as posts
+    
+    # Step 4: Process each post to get its comments
+    for post, html in zip(posts, pages):       # Loop through each post URL and its downloaded HTML
         print("\nPost URL:", post)             # Print the URL of the post we're about to process
         
         # Get comments from this specific post
-        comments = scrape_post_comments(post, headers)  # Call our function to extract comments
+        comments = parse_post_comments(html) if html else []  # Extract comments (empty if download failed)
         print(f"Found {len(comments)} comments (showing up to 3):")  # Show how many comments we found
         
         # Display the first few comments as examples
@@ -137,7 +337,6 @@ def main():
             print(" -", comment)               # Print each comment with a dash prefix
         
         print("=" * 50)                        # Print a line of equals signs as a separator
-        time.sleep(1)                          # Wait 1 second before processing next post (be polite to Reddit)
 
 # This is the standard Python pattern for running main() when script is executed directly
 if __name__ == "__main__":                    # This condition is True when script is run directly (not imported)
@@ -148,12 +347,13 @@ if __name__ == "__main__":                    # This condition is True when scri
 # 
 # 1. Connects to the r/nyc subreddit on Reddit (old.reddit.com interface)
 # 2. Scrapes multiple pages to find post URLs (up to 3 pages by default)
-# 3. For each post found, visits the post page and extracts comment texts
+# 3. Downloads all post pages concurrently (aiohttp, or a 16-thread pool capped at 8 req/s) and extracts comment texts
 # 4. Displays the post URLs and first few comments from each post
-# 5. Uses polite delays between requests to avoid overwhelming Reddit's servers
+# 5. Uses polite delays between pages and a per-host cap to avoid overwhelming Reddit's servers
 # 
 # HOW IT WORKS:
 # - Uses old.reddit.com because it's easier to scrape than new Reddit
+# - Parses pages with selectolax when installed (BeautifulSoup + lxml/html.parser otherwise)
 # - Finds posts by looking for HTML elements with class "thing"
 # - Extracts post URLs from the "data-permalink" attribute
 # - Finds comments by looking for HTML elements with class "usertext-body"
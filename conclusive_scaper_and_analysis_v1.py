@@ -7,10 +7,12 @@
 
 # Import all the libraries we need for this program
 import os                           # For reading environment variables (like API keys)
+import re                           # For compiled pattern matching (city synonyms)
 import time                         # For adding delays between web requests (to be polite)
 import json                         # For working with JSON data from APIs
 import random                       # For randomly sampling data when we have too much
 import requests                     # For making HTTP requests to websites
+from requests.adapters import HTTPAdapter  # For connection pooling (keep-alive socket reuse)
 from bs4 import BeautifulSoup      # For parsing HTML content from websites
 import spacy                        # For natural language processing (understanding text)
 import numpy as np                  # For mathematical operations on arrays
@@ -19,10 +21,87 @@ from dataclasses import dataclass  # For creating simple data structures
 from typing import List, Dict, Any, Optional, Tuple, Set  # For type hints (helps with code clarity)
 from contextlib import contextmanager  # For creating context managers
 import signal                       # For handling system signals
+import argparse                     # For command-line flags (e.g. --batch)
+import sys                          # For writing output in blocks
 from urllib.parse import urljoin, urlparse  # For working with URLs
 from datetime import datetime, timezone     # For handling dates and times
+from types import MappingProxyType     # For a read-only headers dictionary
+import asyncio                      # For overlapping many downloads at once
+import threading                    # For naming temp files per thread in the page cache
+import hashlib                      # For naming cached pages on disk (and cached OpenAI answers)
+import sqlite3                      # For the on-disk cache of OpenAI answers
+import heapq                        # For picking the top few items without sorting everything
+import zlib                         # For compressing cached pages on disk
+from itertools import islice         # For taking the first N items without copying a list
+from functools import lru_cache     # For building the OpenAI client only once
+from fnmatch import fnmatch         # For matching site patterns in HTTP_CACHE_TTLS
+from concurrent.futures import ThreadPoolExecutor  # For parallel downloads when aiohttp isn't installed
 
-from sklearn.cluster import AgglomerativeClustering  # For grouping similar keywords together
+try:
+    # Retry utilities for the pooled HTTP session
+    from urllib3.util.retry import Retry
+except Exception:
+    Retry = None
+
+try:
+    # Optional dependency for concurrent downloads; we gracefully fall back to safe_request if missing
+    import aiohttp                  # Async HTTP client used by fetch_all()
+except Exception:                   # If not installed, fetch_all() uses a thread pool instead
+    aiohttp = None
+
+try:
+    # Optional multi-pattern matcher (pyahocorasick) for fast city-synonym detection
+    import ahocorasick              # C implementation of the Aho-Corasick automaton
+except Exception:                   # If not installed, we check each synonym separately
+    ahocorasick = None
+
+try:
+    # Optional fast JSON parser (orjson, written in Rust) for Reddit and OpenAI responses
+    import orjson
+except Exception:                   # If not installed, the standard library json module is used
+    orjson = None
+
+try:
+    # Optional C HTML parser (selectolax's Lexbor backend), 10-30x faster than BeautifulSoup's html.parser
+    from selectolax.lexbor import LexborHTMLParser
+except Exception:                   # If not installed, BeautifulSoup parses the pages
+    LexborHTMLParser = None
+
+try:
+    # Optional C-based parser for BeautifulSoup (used when selectolax is missing)
+    import lxml                     # noqa: F401 (only checked for presence)
+    HTML_PARSER = "lxml"            # Much faster than the pure-Python parser
+except Exception:                   # If not installed, use Python's built-in parser
+    HTML_PARSER = "html.parser"
+
+try:
+    # Optional on-disk HTTP caches so reruns don't re-download unchanged pages
+    import requests_cache           # SQLite cache for the synchronous requests session
+except Exception:                   # If not installed, every run downloads everything again
+    requests_cache = None
+
+try:
+    from aiohttp_client_cache import CachedSession, SQLiteBackend  # Same idea for the aiohttp downloads
+except Exception:
+    CachedSession = SQLiteBackend = None
+
+try:
+    # Optional HTTP/2 client: many requests to the same site share one multiplexed connection
+    import httpx
+    import h2                       # noqa: F401 (httpx needs it for http2=True)
+except Exception:                   # If not installed, the requests SESSION below is used
+    httpx = None
+
+try:
+    # Optional streaming JSON parser: lets us stop reading a huge comment thread once we have enough comments
+    import ijson
+except Exception:                   # If not installed, the whole comment JSON is downloaded and parsed
+    ijson = None
+
+# Parse a JSON string: orjson when available (several times faster), otherwise json.loads
+json_loads = orjson.loads if orjson is not None else json.loads
+
+from sklearn.cluster import MiniBatchKMeans  # For grouping similar keywords together
 
 # =========================
 # CONFIGURATION SECTION
@@ -160,6 +239,29 @@ CITY_SYNONYMS = {
     "amsterdam": "Amsterdam",               # Dutch capital
 }
 
+# Build one Aho-Corasick automaton over all synonyms at import time (if pyahocorasick is installed)
+# Scanning a text with it finds every synonym in a single pass, instead of one substring search per synonym
+_CITY_AC = None                             # Stays None when pyahocorasick is missing
+if ahocorasick is not None:
+    _CITY_AC = ahocorasick.Automaton()      # Empty automaton
+    for _k, _canonical in CITY_SYNONYMS.items():  # Add each synonym with its text and canonical city
+        _CITY_AC.add_word(_k, (_k, _canonical))
+    _CITY_AC.make_automaton()               # Compile the patterns into the matching automaton
+
+# Fallback when pyahocorasick is missing: one compiled alternation of all synonyms
+# Longest synonyms first so "new york city" wins over "new york"; the lookarounds require whole words
+# (so "la" does not match inside "plan"), and unlike \b they also work for synonyms ending in "." like "l.a."
+CITY_PATTERN = re.compile(
+    r"(?<!\w)(" + "|".join(sorted(map(re.escape, CITY_SYNONYMS), key=len, reverse=True)) + r")(?!\w)",
+    re.IGNORECASE,
+)
+
+def _is_word_char(c: str) -> bool:
+    """
+    True if c is a letter, digit, or underscore (the same characters as regex \w)
+    """
+    return c.isalnum() or c == "_"
+
 # The 12 dimensions we use to measure civic health
 # These represent different aspects of city life quality
 CIVIC_DIMENSIONS = [
@@ -177,37 +279,102 @@ CIVIC_DIMENSIONS = [
     "health",           # Healthcare access, quality, and public health
 ]
 
+# Words that indicate a link is probably not a news article
+# We want to avoid login pages, ads, newsletters, etc.
+DISALLOW_PATH_WORDS = (
+    "login", "subscribe", "privacy", "terms", "contact", "about", "account",     # Account-related pages
+    "profile", "help", "signup", "register", "cookie", "advert", "ads",         # User/admin pages
+    "newsletter", "newsletters", "video", "videos", "watch", "live", "sport",   # Media/entertainment
+    "sports", "weather", "sso", "comment-policy"                                # Other non-article pages
+)
+
+# Check a URL path for all of those words in a single pass (built once, not on every call)
+_DISALLOW_AC = None                         # Stays None when pyahocorasick is missing
+if ahocorasick is not None:
+    _DISALLOW_AC = ahocorasick.Automaton()
+    for _k in DISALLOW_PATH_WORDS:
+        _DISALLOW_AC.add_word(_k, _k)
+    _DISALLOW_AC.make_automaton()
+DISALLOW_PATTERN = re.compile("|".join(map(re.escape, DISALLOW_PATH_WORDS)))  # Fallback: one compiled alternation
+
+# A URL path segment that looks like part of an article slug: 4+ letters, or 4+ characters containing a hyphen
+ARTICLE_SEGMENT_PATTERN = re.compile(r"(?:^|/)(?:[^\W\d_]{4,}|(?=[^/]*-)[^/]{4,})(?=/|$)")
+
 # Settings that control how much data we collect
 # MAXIMIZED FOR HIGHEST ACCURACY - Collect as much data as possible
 PER_SOURCE_ARTICLE_LIMIT = 500      # How many articles to get from each news site (MAXIMIZED)
 REDDIT_MAX_PAGES = 10               # How many pages of Reddit posts to scrape per city (MAXIMIZED)
 REDDIT_COMMENTS_PER_POST_LIMIT = 100 # How many comments to collect per Reddit post (MAXIMIZED)
+REDDIT_REQUESTS_PER_SEC = 4         # Max requests per second to each Reddit host when fetching concurrently (be polite)
+REDDIT_MAX_RETRIES = 4              # Tries per Reddit request (a 429 backs off 0.6s, 1.2s, 2.4s before the last try)
 GLOBAL_SAMPLE_TITLES_FOR_TOPICS = 200  # How many article titles to send to AI for topic analysis (INCREASED)
 KEYWORD_PHRASE_LIMIT_FOR_TOPICS = 1000 # How many keyword phrases to analyze for topics (MAXIMIZED)
 CITY_DOCS_PER_MODEL_CALL = 100      # How many documents to send to AI per city (INCREASED for better analysis)
+OPENAI_CONCURRENCY = 8              # How many cities to score with OpenAI at the same time
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))       # Requests per minute allowed on your OpenAI account tier
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))    # Tokens per minute allowed on your OpenAI account tier
+OPENAI_MAX_ATTEMPTS = 5             # Tries per city before giving up on a rate-limited / failing request
+OPENAI_USE_BATCH = os.getenv("OPENAI_BATCH") == "1"  # Score cities via the Batch API (half price, can take hours): --batch, or OPENAI_BATCH=1
+OPENAI_BATCH_POLL_SEC = 30          # How often to check whether a batch job has finished
+MAX_PAGE_BYTES = 1_000_000          # Stop reading a page after ~1MB (titles and links are near the top)
+
+# On-disk HTTP cache for reruns: requests-cache / aiohttp-client-cache when installed,
+# otherwise a simple folder of compressed pages (see page_cache_get). Set HTTP_CACHE_PATH="" to turn it off
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "scrape_cache")  # Cache file/folder name prefix
+HTTP_CACHE_TTLS = {                 # How long a cached page stays fresh, per site (seconds)
+    "*.reddit.com": 3600,           # Reddit listings and comment threads: 1 hour
+    "*": 600,                       # News homepages and articles: 10 minutes
+}
 
 # OpenAI API settings
 # The AI model to use and where to find the API key
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Use environment variable or default to mini model
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # Must be set in your shell before running script
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")  # Saved OpenAI answers for reruns ("" turns it off)
 
 # Standard headers to send with web requests
 # This makes our requests look like they're coming from a real web browser
-DEFAULT_HEADERS = {
+# Read-only (MappingProxyType) so no function can accidentally change them for everyone else
+DEFAULT_HEADERS = MappingProxyType({
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",  # Pretend to be Chrome browser
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",  # Accept HTML and XML content
     "Accept-Language": "en-US,en;q=0.9",    # Prefer English content
     "Connection": "keep-alive",              # Keep connection open for efficiency
     "Referer": "https://www.google.com/",    # Pretend we came from Google
-}
+})
+
+# One shared HTTP session for every synchronous request
+# Reusing it keeps TCP+TLS connections open (keep-alive) instead of a fresh handshake per page
+if requests_cache is not None and HTTP_CACHE_PATH:  # Cached session: reruns are served from disk
+    SESSION = requests_cache.CachedSession(HTTP_CACHE_PATH, backend="sqlite", allowable_codes=(200,),
+                                           urls_expire_after=HTTP_CACHE_TTLS)
+else:
+    SESSION = requests.Session()
+SESSION.headers.update(DEFAULT_HEADERS)     # Attach our browser headers once, not on every call
+if Retry is not None:                       # Retry transient server errors inside the connection pool
+    _adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64,
+                           max_retries=Retry(total=1, backoff_factor=0.6, status_forcelist=(502, 503, 504), allowed_methods=("GET",)))
+else:
+    _adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# HTTP/2 client for safe_request when httpx is installed (skipped if requests-cache is caching SESSION)
+HTTP2_CLIENT = None
+if httpx is not None and requests_cache is None:
+    HTTP2_CLIENT = httpx.Client(http2=True, follow_redirects=True, headers=dict(DEFAULT_HEADERS),
+                                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64))
 
 # =========================
 # DATA STRUCTURES
 # =========================
 
 # Define a data structure to hold information about each article/post/comment
+# No per-instance __dict__: every scraped article, post and comment becomes one of these
 @dataclass
 class Entry:
+    __slots__ = ("source", "source_site", "url", "title", "date", "text", "cities")
+    
     source: str                 # Type of content: 'News', 'RedditPost', or 'RedditComment'
     source_site: str            # Which website it came from (e.g., 'www.nytimes.com' or 'r/nyc')
     url: str                    # The web address of the article/post
@@ -220,29 +387,117 @@ class Entry:
 # UTILITY FUNCTIONS
 # =========================
 
+def cache_ttl_for(url: str) -> int:
+    """
+    How long (seconds) a cached copy of this URL stays fresh, from HTTP_CACHE_TTLS
+    """
+    host = urlparse(url).netloc.lower()
+    for pattern, ttl in HTTP_CACHE_TTLS.items():  # First matching pattern wins ("*" is last)
+        if fnmatch(host, pattern):
+            return ttl
+    return 0
+
+def _page_cache_file(url: str) -> str:
+    """
+    Path of the on-disk cache file for a URL (spread over 256 sub-folders)
+    """
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(HTTP_CACHE_PATH + "_pages", key[:2], key)
+
+def page_cache_get(url: str) -> Optional[str]:
+    """
+    Return the cached HTML for a URL if we saved it recently enough, else None
+    (only used when requests-cache isn't installed - it does this job itself)
+    """
+    if requests_cache is not None or not HTTP_CACHE_PATH:
+        return None
+    path = _page_cache_file(url)
+    try:
+        if time.time() - os.path.getmtime(path) > cache_ttl_for(url):  # Too old: download again
+            return None
+        with open(path, "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+    except Exception:                          # Not cached (or unreadable) - just download it
+        return None
+
+def page_cache_put(url: str, text: str) -> None:
+    """
+    Save downloaded HTML for a URL (compressed, ~5x smaller) so the next run can reuse it
+    """
+    if requests_cache is not None or not HTTP_CACHE_PATH:
+        return
+    path = _page_cache_file(url)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Write aside, then swap in (safe with threads)
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(text.encode("utf-8"), 3))
+        os.replace(tmp, path)
+    except Exception:                          # Caching is best-effort
+        pass
+
+def read_capped(chunks, encoding: Optional[str], content_type: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Join a response body's chunks into text, stopping after MAX_PAGE_BYTES for HTML
+    
+    Args:
+        chunks: The body as an iterator of byte chunks
+        encoding: The charset the server declared (UTF-8 if none)
+        content_type: The response's Content-Type; JSON is always read in full (a cut-off
+            document can't be parsed at all)
+    
+    Returns:
+        A tuple (body as text, whether it was cut short)
+    """
+    cap = "json" not in (content_type or "").lower()  # Only HTML is still useful when cut short
+    buf = bytearray()                          # Collect the body bytes here
+    truncated = False
+    for chunk in chunks:                       # Read one piece at a time
+        buf.extend(chunk)                      # Add this piece to the body
+        if cap and len(buf) >= MAX_PAGE_BYTES: # Huge page (ads, inline scripts...)
+            truncated = True
+            break                              # Stop reading - we have enough to parse
+    return buf.decode(encoding or "utf-8", errors="replace"), truncated
+
 def safe_request(url: str, headers: Optional[dict] = None, timeout: int = 20, max_retries: int = 2) -> Optional[str]:
     """
     Safely download a web page with error handling and retries
     
     Args:
         url: The web address to download
-        headers: HTTP headers to send (defaults to our standard browser headers)
+        headers: Extra HTTP headers for this request only (SESSION already sends DEFAULT_HEADERS)
         timeout: How long to wait before giving up (in seconds)
         max_retries: How many times to try if it fails
     
     Returns:
         The HTML content of the page, or None if it failed
     """
-    hdrs = headers or DEFAULT_HEADERS  # Use provided headers or our default browser headers
+    cached = page_cache_get(url)               # Saved by a recent run?
+    if cached is not None:
+        return cached
     
     # Try multiple times in case of temporary network issues
     for attempt in range(max_retries):         # Loop through retry attempts
         try:
-            # Make the HTTP request to download the webpage
-            r = requests.get(url, headers=hdrs, timeout=timeout)  # Send GET request with headers and timeout
-            # Check if the request was successful (status code 200 means "OK")
-            if r.status_code == 200:           # If server responded with success
-                return r.text                  # Return the HTML content as text
+            # Make the HTTP request to download the webpage (reuses pooled keep-alive connections)
+            # requests' timeout only bounds each socket operation; time_limit bounds the whole download
+            with time_limit(timeout):
+                if HTTP2_CLIENT is not None:   # HTTP/2: reuse one multiplexed connection per site
+                    with HTTP2_CLIENT.stream("GET", url, headers=headers, timeout=timeout) as r:
+                        if r.status_code == 200:  # If server responded with success
+                            text, truncated = read_capped(r.iter_bytes(65536), r.encoding, r.headers.get("Content-Type"))
+                            if not truncated:  # Only a complete body is worth keeping for the next run
+                                page_cache_put(url, text)
+                            return text        # Return the HTML content as text
+                else:
+                    # stream=True lets us read the body piece by piece instead of all at once
+                    with SESSION.get(url, headers=headers, timeout=timeout, stream=True) as r:
+                        # Check if the request was successful (status code 200 means "OK")
+                        if r.status_code == 200:  # If server responded with success
+                            text, truncated = read_capped(r.iter_content(65536), r.encoding, r.headers.get("Content-Type"))
+                            if not truncated:  # Only a complete body is worth keeping for the next run
+                                page_cache_put(url, text)
+                            return text        # Return the HTML content as text
         except Exception:                      # If any error occurs (network, timeout, etc.)
             pass                               # Ignore the error and try again
         
@@ -252,6 +507,109 @@ def safe_request(url: str, headers: Optional[dict] = None, timeout: int = 20, ma
     # If all attempts failed, return None
     return None                                # Indicate that the download completely failed
 
+async def _get_text(session, url: str, headers: Optional[dict] = None) -> Tuple[int, str]:
+    """
+    Send one GET request over an aiohttp session and return (status code, body text)
+    """
+    async with session.get(url, headers=headers) as resp:       # Send the GET request over the pooled session
+        return resp.status, await resp.text(errors="replace")  # Read the body as text
+
+class HostRateLimiter:
+    """
+    Spaces requests out to at most `rate` per second for each host (one event loop only) -
+    replaces the fixed sleeps of the sequential loops
+    """
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate             # Minimum gap between two requests to the same host (seconds)
+        self.next_time: Dict[str, float] = {}  # Host -> earliest time its next request may start
+
+    async def await_turn(self, url: str) -> None:
+        """
+        Pause this coroutine (without blocking the others) until it may send its request to url's host
+        """
+        host = urlparse(url).netloc.lower()
+        now = time.monotonic()
+        slot = max(now, self.next_time.get(host, now))  # Our slot is now, or right after the last reserved one
+        self.next_time[host] = slot + self.interval     # Push that host's next slot forward
+        if slot > now:
+            await asyncio.sleep(slot - now)    # Other downloads keep running while we wait
+
+async def afetch(session, url: str, sem: "asyncio.Semaphore", timeout: int = 20, max_retries: int = 2,
+                 headers: Optional[dict] = None, limiter: Optional[HostRateLimiter] = None) -> Optional[str]:
+    """
+    Async version of safe_request: download one page with a concurrency cap and retries
+    
+    Args:
+        session: Shared aiohttp.ClientSession (keeps connections open between requests)
+        url: The web address to download
+        sem: Semaphore limiting how many downloads run at the same time
+        timeout: How long to wait before giving up (in seconds)
+        max_retries: How many times to try if it fails
+        headers: Extra HTTP headers for this request only (the session already sends DEFAULT_HEADERS)
+        limiter: Per-host pacing for every attempt (retries included), if given
+    
+    Returns:
+        The HTML content of the page, or None if it failed
+    """
+    cached = page_cache_get(url)               # Saved by a recent run?
+    if cached is not None:
+        return cached
+    
+    for attempt in range(max_retries):         # Loop through retry attempts
+        try:
+            if limiter is not None:            # Wait for this host's next free time slot
+                await limiter.await_turn(url)
+            async with sem:                    # Wait for a free download slot
+                status, text = await asyncio.wait_for(_get_text(session, url, headers), timeout)  # Bounded total time
+            if status == 200:                  # If server responded with success
+                page_cache_put(url, text)      # Keep a copy for the next run
+                return text                    # Return the HTML content as text
+            if status != 429 and status < 500: # Other client errors won't fix themselves on retry
+                return None                    # Give up on this URL
+        except Exception:                      # If any error occurs (network, timeout, etc.)
+            pass                               # Ignore the error and try again
+        await asyncio.sleep(0.6 * (2 ** attempt))  # Exponential backoff: 0.6s, 1.2s, 2.4s...
+    return None                                # Indicate that the download completely failed
+
+def open_async_session():
+    """
+    Create the pooled aiohttp session used for concurrent downloads (max 8 connections per host)
+    
+    Returns:
+        An aiohttp session (on-disk cached when aiohttp-client-cache is installed), used with "async with"
+    """
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=8, ttl_dns_cache=300)  # Pooled connections + DNS cache
+    if CachedSession is not None and HTTP_CACHE_PATH:  # Share the on-disk cache across reruns
+        cache = SQLiteBackend(HTTP_CACHE_PATH + "_async", allowed_codes=(200,), urls_expire_after=HTTP_CACHE_TTLS)
+        return CachedSession(cache=cache, connector=connector, headers=DEFAULT_HEADERS)
+    return aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+
+async def _gather_all(urls: List[str], timeout: int) -> List[Optional[str]]:
+    """
+    Download all URLs concurrently over one pooled aiohttp session
+    """
+    sem = asyncio.Semaphore(64)                # Global cap on in-flight downloads
+    async with open_async_session() as session:
+        return await asyncio.gather(*[afetch(session, u, sem, timeout=timeout) for u in urls])
+
+def fetch_all(urls: List[str], timeout: int = 20) -> List[Optional[str]]:
+    """
+    Download many pages at once; results come back in the same order as urls
+    
+    Args:
+        urls: The web addresses to download
+        timeout: How long to wait for each page (in seconds)
+    
+    Returns:
+        List of HTML strings (None for pages that failed)
+    """
+    if not urls:                               # Nothing to download
+        return []
+    if aiohttp is None:                        # No async client installed: download with a pool of threads instead
+        with ThreadPoolExecutor(max_workers=16) as ex:  # Up to 16 downloads in flight (SESSION is thread-safe for GETs)
+            return list(ex.map(lambda u: safe_request(u, timeout=timeout), urls))  # Same order as urls
+    return asyncio.run(_gather_all(urls, timeout))  # Run the async downloads from normal code
+
 def truncate_words(s: str, max_words: int) -> str:
     """
     Cut off text after a certain number of words to keep things manageable
@@ -263,7 +621,9 @@ def truncate_words(s: str, max_words: int) -> str:
     Returns:
         The truncated text with "…" at the end if it was cut off
     """
-    parts = s.split()                          # Split the text into individual words using spaces
+    # Split off at most max_words words; the (max_words+1)-th part is the untouched remainder,
+    # so we never tokenize the rest of a long article
+    parts = s.split(None, max_words)           # Split the first max_words words using whitespace
     if len(parts) <= max_words:                # If the text is already short enough
         return s                               # Return the original text unchanged
     # Otherwise, take only the first max_words and add "…" to show it was cut off
@@ -279,21 +639,58 @@ def unique_preserve_order(seq: List[str]) -> List[str]:
     Returns:
         New list with duplicates removed, original order preserved
     """
-    seen = set()                               # Keep track of items we've already encountered
-    out = []                                   # The new list we're building without duplicates
-    for x in seq:                              # Go through each item in the original list
-        if x not in seen:                      # If we haven't seen this item before
-            seen.add(x)                        # Remember that we've now seen it
-            out.append(x)                      # Add it to our new deduplicated list
-    return out                                 # Return the list without duplicates
+    # dict keys are unique and keep insertion order, so dict.fromkeys dedupes in a single C-level pass
+    return list(dict.fromkeys(seq))            # Return the list without duplicates
+
+class Reservoir:
+    """
+    Keep a uniform random sample of at most k items from a stream, one item at a time (Algorithm R)
+    """
+    __slots__ = ("k", "items", "seen", "rng")
+
+    def __init__(self, k: int, seed: Any = None):
+        self.k = k                             # Maximum number of items to keep
+        self.items: List[Any] = []             # The current sample
+        self.seen = 0                          # How many items have been offered so far
+        self.rng = random.Random(seed)         # Own generator so a seed gives the same sample every run
+
+    def add(self, item: Any) -> None:
+        """
+        Offer one item; it replaces a random kept item with probability k/seen
+        """
+        self.seen += 1
+        if len(self.items) < self.k:           # Still filling up
+            self.items.append(item)
+        else:
+            j = self.rng.randrange(self.seen)
+            if j < self.k:
+                self.items[j] = item
 
 @contextmanager
 def time_limit(seconds: int):
     """
-    A placeholder function for timeout functionality
-    (This is a simplified version - the real timeout logic was removed for stability)
+    Raise TimeoutError if the code inside the "with" block runs longer than `seconds`
+    
+    Uses SIGALRM, so it only works on POSIX systems in the main thread; anywhere else
+    (Windows, worker threads) it silently does nothing instead of failing.
+    
+    Args:
+        seconds: Maximum wall-clock time allowed for the block
     """
-    yield                                      # Just continue without actually implementing timeout
+    def _on_alarm(signum, frame):              # Called by the OS when the alarm fires
+        raise TimeoutError(f"timed out after {seconds}s")
+    
+    try:
+        old_handler = signal.signal(signal.SIGALRM, _on_alarm)  # Install our alarm handler
+    except (AttributeError, ValueError):       # No SIGALRM (Windows) or not in the main thread
+        yield                                  # Run the block without a time limit
+        return
+    signal.alarm(max(1, int(seconds)))         # Ask the OS to send SIGALRM after `seconds`
+    try:
+        yield                                  # Run the block
+    finally:
+        signal.alarm(0)                        # Cancel the alarm if the block finished in time
+        signal.signal(signal.SIGALRM, old_handler)  # Restore whatever handler was there before
 
 def get_domain(url: str) -> str:
     """
@@ -311,6 +708,35 @@ def get_domain(url: str) -> str:
     except Exception:                          # If URL parsing fails for any reason
         return ""                              # Return empty string as fallback
 
+# Page parts that never hold article text (removed before extracting paragraphs)
+UNWANTED_TAGS = ["script", "style", "nav", "footer", "header", "aside"]
+
+# Where the article body usually lives, most specific first (CSS selectors for the selectolax path)
+CONTENT_SELECTORS = ('article', 'main', '[role="main"]', 'div[itemprop="articleBody"]', 'section.article', 'div#main-content')
+
+# City detection: the cheap "could there be a place name?" check run before spaCy
+PROPER_NOUN_PATTERN = re.compile(r"\b[A-Z][a-z]+")
+
+# Query parameters that only track where a click came from; they never change which article a URL points to
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid", "ref", "cmpid", "smid", "mc_")
+
+def canonical_url(url: str) -> str:
+    """
+    Reduce an article URL to a canonical form so the same story isn't downloaded twice
+    (drops tracking query parameters, the #fragment, the trailing slash, and letter case of the domain)
+    
+    Args:
+        url: A full article URL
+    
+    Returns:
+        The canonical version of the URL
+    """
+    p = urlparse(url)                          # Break the URL into its parts
+    query = "&".join(sorted(kv for kv in p.query.split("&")  # Keep the meaningful query parameters, in a fixed order
+                            if kv and not kv.split("=", 1)[0].lower().startswith(TRACKING_PARAM_PREFIXES)))
+    path = p.path.rstrip("/") or "/"           # "/a/b/" and "/a/b" are the same page
+    return f"{p.scheme}://{p.netloc.lower()}{path}" + (f"?{query}" if query else "")
+
 # =========================
 # WEB SCRAPING FUNCTIONS
 # =========================
@@ -327,55 +753,55 @@ def extract_links_from_homepage(base_url: str, html: str, limit: int) -> List[st
     Returns:
         List of article URLs found on the homepage
     """
-    soup = BeautifulSoup(html, "html.parser")  # Parse the HTML content into a searchable structure
+    # Collect the href of every link on the page (C parser when available, BeautifulSoup otherwise)
+    if LexborHTMLParser is not None:           # Fast path: selectolax
+        hrefs = [a.attributes.get("href") or "" for a in LexborHTMLParser(html).css("a[href]")]
+    else:
+        soup = BeautifulSoup(html, HTML_PARSER)  # Parse the HTML content into a searchable structure
+        hrefs = [a.get("href") for a in soup.find_all("a", href=True)]  # All <a> tags that have an href attribute
     links: List[str] = []                      # Initialize empty list to store the links we find
+    seen: Set[str] = set()                     # Same links as a set, for fast "already have it?" checks
     base_domain = get_domain(base_url)         # Get the domain of the main site (e.g., "www.nytimes.com")
     
-    # Words that indicate a link is probably not a news article
-    # We want to avoid login pages, ads, newsletters, etc.
-    disallow = (
-        "login", "subscribe", "privacy", "terms", "contact", "about", "account",     # Account-related pages
-        "profile", "help", "signup", "register", "cookie", "advert", "ads",         # User/admin pages
-        "newsletter", "newsletters", "video", "videos", "watch", "live", "sport",   # Media/entertainment
-        "sports", "weather", "sso", "comment-policy"                                # Other non-article pages
-    )
-    
     # Look through all the links on the page
-    for a in soup.find_all("a", href=True):   # Find all <a> tags that have an href attribute
-        href = a.get("href").strip()           # Get the link URL and remove any whitespace
+    for href in hrefs:                         # Loop through every link URL on the page
+        href = href.strip()                    # Remove any whitespace around the link URL
         if not href or href.startswith("#"):  # Skip empty links or page anchors (internal links)
             continue                           # Move to the next link
         
         # Convert relative URLs to absolute URLs (e.g., "/article" becomes "https://site.com/article")
         full = urljoin(base_url, href)         # Combine base URL with the link to make it complete
-        d = get_domain(full)                   # Get the domain of this link
+        try:
+            parsed = urlparse(full)            # Break down the URL into components (once, for domain and path)
+        except Exception:                      # Malformed URL
+            continue                           # Skip it and move to the next link
         
         # Only keep links that are on the same website (avoid external links)
-        if d != base_domain:                   # If this link goes to a different website
+        if parsed.netloc != base_domain:       # If this link goes to a different website
             continue                           # Skip it and move to the next link
         
-        # Parse the URL to examine its structure
-        parsed = urlparse(full)                # Break down the URL into components
         path = parsed.path or "/"              # Get the path part of the URL (everything after domain)
         
-        # Skip links that contain words from our disallow list
-        if any(k in path.lower() for k in disallow):  # Check if any forbidden words are in the path
+        # Skip links that contain words from our disallow list (DISALLOW_PATH_WORDS)
+        path_l = path.lower()                  # Lowercase once for the check below
+        if _DISALLOW_AC is not None:           # One Aho-Corasick pass finds any forbidden word
+            if next(_DISALLOW_AC.iter(path_l), None) is not None:
+                continue                       # Skip this link if it matches forbidden patterns
+        elif DISALLOW_PATTERN.search(path_l):  # Same check with the compiled regex
             continue                           # Skip this link if it matches forbidden patterns
         
-        # Break the path into segments (parts separated by "/")
-        segments = [seg for seg in path.split("/") if seg]  # Split path by "/" and remove empty segments
-        
-        # Skip if the path is too short (probably not an article)
-        if len(segments) < 2:                  # If path has fewer than 2 segments
+        # Skip if the path is too short (fewer than 2 segments - probably just a section page)
+        if "/" not in path.strip("/"):         # Two or more segments always leave a "/" in the middle
             continue                           # Skip it (probably just the homepage)
         
         # Check if the path looks like it could be an article
         # Articles usually have segments with letters, hyphens, and reasonable length
-        if not any(("-" in seg or seg.isalpha()) and len(seg) >= 4 for seg in segments):
+        if ARTICLE_SEGMENT_PATTERN.search(path) is None:
             continue                           # Skip if path doesn't look like an article URL
         
         # If this link passes all our tests, add it to our collection
-        if full not in links:                  # If we haven't already collected this link
+        if full not in seen:                   # If we haven't already collected this link
+            seen.add(full)
             links.append(full)                 # Add it to our list of article URLs
         
         # Stop when we have enough links (collect extra since some might not be real articles)
@@ -394,10 +820,13 @@ def extract_title_and_text(html: str) -> Tuple[str, str]:
     Returns:
         A tuple containing (title, main_text)
     """
-    soup = BeautifulSoup(html, 'html.parser')  # Parse the HTML content into a searchable structure
+    if LexborHTMLParser is not None:           # Fast path: same steps with the C parser
+        return extract_title_and_text_lexbor(html)
+    
+    soup = BeautifulSoup(html, HTML_PARSER)    # Parse the HTML content into a searchable structure
     
     # Remove elements we don't want (scripts, navigation, ads, etc.)
-    for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):  # Find unwanted tags
+    for tag in soup(UNWANTED_TAGS):            # Find unwanted tags
         tag.decompose()                        # Completely remove these tags from the HTML
     
     # Try to find the article title using multiple methods
@@ -422,17 +851,15 @@ def extract_title_and_text(html: str) -> Tuple[str, str]:
     texts: List[str] = []                      # Initialize list to store paragraphs of text
     
     # Try to find the main content area using different common HTML patterns
-    roots = [
-        soup.find('article'),                           # Look for <article> tag (semantic HTML)
-        soup.find('main'),                              # Look for <main> tag (semantic HTML)
-        soup.find(attrs={'role': 'main'}),              # Look for role="main" attribute
-        soup.find('div', attrs={'itemprop': 'articleBody'}),  # Look for structured data markup
-        soup.find('section', class_='article'),         # Look for article section with class
-        soup.find('div', id='main-content'),            # Look for main content div by ID
-    ]
-    
-    # Use the first content container we find, or fall back to searching the whole page
-    container = next((r for r in roots if r), None)    # Get first non-None container from the list
+    # "or" stops at the first one found, so later searches only run when the earlier ones fail
+    container = (
+        soup.find('article')                            # Look for <article> tag (semantic HTML)
+        or soup.find('main')                            # Look for <main> tag (semantic HTML)
+        or soup.find(attrs={'role': 'main'})            # Look for role="main" attribute
+        or soup.find('div', attrs={'itemprop': 'articleBody'})  # Look for structured data markup
+        or soup.find('section', class_='article')       # Look for article section with class
+        or soup.find('div', id='main-content')          # Look for main content div by ID
+    )                                                   # None: fall back to searching the whole page
     
     # Find all paragraph tags in the content area (or whole page if no container found)
     ps = container.find_all('p') if container else soup.find_all('p')  # Get all <p> tags from container or page
@@ -450,7 +877,53 @@ def extract_title_and_text(html: str) -> Tuple[str, str]:
     
     return title, text                         # Return both the title and the combined text
 
-def scrape_news_site(base_url: str, label: str, limit: int) -> List[Entry]:
+def extract_title_and_text_lexbor(html: str) -> Tuple[str, str]:
+    """
+    selectolax version of extract_title_and_text (same rules, same thresholds)
+    
+    Args:
+        html: The HTML content of the article page
+    
+    Returns:
+        A tuple containing (title, main_text)
+    """
+    tree = LexborHTMLParser(html)              # Parse the HTML in C
+    
+    # Remove elements we don't want (scripts, navigation, ads, etc.) in one C-level pass
+    tree.strip_tags(UNWANTED_TAGS)
+    
+    # Title: Open Graph title, then <title>, then the first <h1>
+    title = ''
+    og = tree.css_first('meta[property="og:title"]')
+    if og is not None and og.attributes.get('content'):
+        title = og.attributes['content'].strip()
+    if not title:
+        t = tree.css_first('title')
+        title = t.text(strip=True) if t is not None else ''
+    if not title:
+        h1 = tree.css_first('h1')
+        title = h1.text(strip=True) if h1 is not None else ''
+    
+    # Main text: paragraphs inside the first content container we find (or the whole page)
+    container = None
+    for sel in CONTENT_SELECTORS:
+        container = tree.css_first(sel)
+        if container is not None:
+            break
+    ps = (container or tree).css('p')
+    
+    texts: List[str] = []
+    for p in ps:
+        t = p.text(separator=" ", strip=True)
+        if t and len(t.split()) >= 3:          # Same 3-word minimum as the BeautifulSoup path
+            texts.append(t)
+        if len(texts) >= 200:                  # Same 200-paragraph cap
+            break
+    
+    return title, "\n".join(texts)
+
+def scrape_news_site(base_url: str, label: str, limit: int, homepage_html: Optional[str] = None,
+                     seen: Optional[Set[str]] = None) -> List[Entry]:
     """
     Scrape articles from a single news website
     
@@ -458,6 +931,8 @@ def scrape_news_site(base_url: str, label: str, limit: int) -> List[Entry]:
         base_url: The main URL of the news site (e.g., "https://www.nytimes.com")
         label: A friendly name for the site (for display purposes)
         limit: Maximum number of articles to collect from this site
+        homepage_html: Already-downloaded homepage HTML (downloaded here if not given)
+        seen: Canonical URLs already downloaded in this run (shared across sites; updated here)
     
     Returns:
         List of Entry objects containing the scraped articles
@@ -465,52 +940,68 @@ def scrape_news_site(base_url: str, label: str, limit: int) -> List[Entry]:
     print(f"[news] Using requests extractor for {label}")  # Show progress message to user
     entries: List[Entry] = []                  # Initialize empty list to store articles we find
     
-    # Step 1: Download the homepage of the news website
-    homepage_html = safe_request(base_url, headers=DEFAULT_HEADERS, timeout=12)  # Download homepage with 12-second timeout
+    # Step 1: Download the homepage of the news website (unless the caller already did)
+    if homepage_html is None:                  # No pre-fetched homepage was passed in
+        homepage_html = safe_request(base_url, timeout=12)  # Download homepage with 12-second timeout
     if not homepage_html:                      # If we couldn't download the homepage
         return entries                         # Return empty list (no articles collected)
     
     # Step 2: Find article links on the homepage
     candidates = extract_links_from_homepage(base_url, homepage_html, limit)  # Extract potential article URLs
     
-    # Step 3: Download and process each article (MAXIMIZED DATA COLLECTION)
+    # Drop links that point to an article we already have (same URL apart from tracking junk)
+    seen = set() if seen is None else seen     # Only this site's links if the caller didn't share a set
+    unique: List[str] = []
+    for u in candidates:                       # Loop through each candidate link
+        key = canonical_url(u)                 # Same key for ".../story?utm_source=x" and ".../story/"
+        if key not in seen:                    # First time we see this article
+            seen.add(key)
+            unique.append(u)
+    candidates = unique                        # Only download each article once
+    
+    # Step 3: Download and process articles in concurrent batches (MAXIMIZED DATA COLLECTION)
     count = 0                                  # Initialize counter for successfully processed articles
     total_candidates = len(candidates)         # Get total number of candidate URLs for progress tracking
-    for i, url in enumerate(candidates):       # Loop through each potential article URL with index
+    batch_size = 32                            # How many article pages to download at the same time
+    for start in range(0, total_candidates, batch_size):  # Walk through the candidates one batch at a time
         if count >= limit:                     # If we've already collected enough articles
             break                              # Stop processing more articles
         
         # Show progress for large-scale scraping
-        if i % 50 == 0:                        # Every 50 articles, show progress
-            print(f"    Progress: {i}/{total_candidates} URLs processed, {count} articles collected")
+        print(f"    Progress: {start}/{total_candidates} URLs processed, {count} articles collected")
+        
+        # Download the whole batch of article pages concurrently
+        batch = candidates[start:start + batch_size]  # The URLs in this batch
+        pages = fetch_all(batch, timeout=12)  # HTML for each URL (None if failed)
         
-        try:                                   # Try to process this article (might fail)
-            # Download the individual article page
-            html = safe_request(url, headers=DEFAULT_HEADERS, timeout=12)  # Download article with 12-second timeout
+        for url, html in zip(batch, pages):    # Loop through each article URL and its HTML
+            if count >= limit:                 # If we've already collected enough articles
+                break                          # Stop processing more articles
             if not html:                       # If download failed
                 continue                       # Skip to the next article
             
-            # Extract title and text from the article HTML
-            title, text = extract_title_and_text(html)  # Parse HTML to get meaningful content
-            
-            # Check if we got meaningful content (filter out empty content only - relaxed for maximum data)
-            if not (title or text) or (len(text.split()) < 10 and len(title) < 3):  # If no content or extremely short (relaxed threshold)
-                continue                       # Skip this article and move to next
-            
-            # Create an Entry object to store this article's information
-            entries.append(Entry(
-                source="News",                 # Mark this as a news article
-                source_site=label,             # Record which website it came from
-                url=url,                       # Store the article's URL
-                title=title,                   # Store the article's title
-                date=None,                     # We don't extract publication dates in this version
-                text=text,                     # Store the article's main text content
-                cities=[],                     # Empty for now - will be filled later by city detection
-            ))
-            count += 1                         # Increment our counter of successfully processed articles
-            
-        except Exception:                      # If anything goes wrong with this article
-            continue                           # Skip it and continue with the next article
+            try:                               # Try to process this article (might fail)
+                # Extract title and text from the article HTML
+                title, text = extract_title_and_text(html)  # Parse HTML to get meaningful content
+                
+                # Check if we got meaningful content (filter out empty content only - relaxed for maximum data)
+                if not (title or text) or (len(text.split()) < 10 and len(title) < 3):  # If no content or extremely short (relaxed threshold)
+                    continue                   # Skip this article and move to next
+                
+                # Create an Entry object to store this article's information
+                entries.append(Entry(
+                    source="News",             # Mark this as a news article
+                    source_site=label,         # Record which website it came from
+                    url=url,                   # Store the article's URL
+                    title=title,               # Store the article's title
+                    date=None,                 # We don't extract publication dates in this version
+                    text=text,                 # Store the article's main text content
+                    cities=[],                 # Empty for now - will be filled later by city detection
+                ))
+                count += 1                     # Increment our counter of successfully processed articles
+                
+            except Exception:                  # If anything goes wrong with this article
+                continue                       # Skip it and continue with the next article
     
     return entries                             # Return all the articles we successfully collected
 
@@ -526,22 +1017,26 @@ def scrape_all_news(sites: List[str], per_site_limit: int) -> List[Entry]:
         Combined list of all articles from all sites
     """
     results: List[Entry] = []                  # Initialize empty list to store all articles
+    seen: Set[str] = set()                     # Canonical URLs of every article queued so far (across all sites)
+    
+    # Download every homepage at once: the sites are all different hosts, so they don't share a rate limit
+    homepages = fetch_all(sites, timeout=12)  # Homepage HTML per site (None if failed)
     
     # Go through each news website in our list
-    for site in sites:                         # Loop through each news website URL
+    for site, homepage_html in zip(sites, homepages):  # Loop through each news website URL and its homepage
         # Create a friendly label from the URL (remove protocol and path)
         label = site.replace("https://", "").replace("http://", "").split("/")[0]  # Extract just the domain name
         print(f"Scraping news: {label}")       # Show which site we're currently working on
         
         # Scrape articles from this specific site
-        chunk = scrape_news_site(site, label, per_site_limit)  # Get articles from this site
+        if not homepage_html:                  # If we couldn't download the homepage
+            print("  -> 0 articles")           # Nothing to follow from this site
+            continue                           # Move on to the next site
+        chunk = scrape_news_site(site, label, per_site_limit, homepage_html=homepage_html, seen=seen)  # Get articles from this site
         print(f"  -> {len(chunk)} articles")   # Show how many articles we successfully got
         
         # Add these articles to our main collection
         results.extend(chunk)                  # Add all articles from this site to our master list
-        
-        # Wait a bit before moving to the next site (reduced delay for faster massive data collection)
-        time.sleep(0.3)                        # Sleep for 0.3 seconds between sites (reduced for speed)
     
     return results                             # Return all articles from all sites
 
@@ -562,53 +1057,19 @@ def reddit_fetch_subreddit_json(sub: str, max_pages: int) -> List[Dict[str, Any]
     # Get multiple pages of posts from this subreddit
     for _ in range(max_pages):                 # Loop for the specified number of pages
         # Build the URL for Reddit's JSON API
-        url = f"https://www.reddit.com/r/{sub}/.json?limit=50"  # Base URL with 50 posts per page
-        if after:                              # If we have a pagination token from previous page
-            url += f"&after={after}"           # Add it to get the next page of posts
+        url = subreddit_page_url(sub, after)   # Page URL (with the pagination token after page 1)
         
         # Download the JSON data from Reddit's API
-        jtxt = safe_request(url, headers={**DEFAULT_HEADERS, "Referer": f"https://www.reddit.com/r/{sub}/"}, timeout=12)
+        jtxt = safe_request(url, headers={"Referer": f"https://www.reddit.com/r/{sub}/"}, timeout=12)
         if not jtxt:                           # If download failed
             break                              # Stop trying to get more pages
         
-        try:
-            # Parse the JSON response from Reddit
-            data = json.loads(jtxt)             # Convert JSON string to Python dictionary
-        except Exception:                      # If JSON parsing failed
-            break                              # Stop trying to get more pages
-        
-        # Extract the list of posts from Reddit's JSON structure
-        children = data.get('data', {}).get('children', [])  # Navigate to the posts array in JSON
-        if not children:                       # If no posts found on this page
+        # Turn the JSON into post dictionaries plus the token for the next page
+        page_items, after = parse_subreddit_listing(jtxt)
+        if not page_items:                     # If parsing failed or no posts found on this page
             break                              # Stop trying to get more pages
+        items.extend(page_items)               # Add this page's posts to our collection
         
-        # Process each post we found
-        for ch in children:                    # Loop through each post in the JSON response
-            d = ch.get('data', {})             # Get the post data dictionary
-            permalink = d.get('permalink')     # Get the post's permalink (unique path)
-            title = d.get('title', '')         # Get the post title (empty string if missing)
-            
-            # Build the full URL for this post
-            full_url = urljoin("https://www.reddit.com/", permalink) if permalink else None  # Create complete URL
-            
-            # Convert Reddit's timestamp to a readable date format
-            created = d.get('created_utc')     # Reddit stores creation time as Unix timestamp
-            iso_date = None                    # Initialize date as None
-            if isinstance(created, (int, float)):  # If we have a valid timestamp
-                # Convert Unix timestamp to ISO format date string
-                iso_date = datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
-            
-            # If we have a valid URL, add this post to our collection
-            if full_url:                       # If we successfully built a URL
-                items.append({                 # Add post information to our list
-                    "url": full_url,           # The complete URL to the post
-                    "title": title,            # The post's title
-                    "date": iso_date,          # The post's creation date
-                    "permalink": permalink     # The permalink for getting comments later
-                })
-        
-        # Get the pagination token for the next page
-        after = data.get('data', {}).get('after')  # Reddit provides this token to get next page
         if not after:                          # If no next page token
             break                              # We've reached the end, stop here
         
@@ -617,6 +1078,61 @@ def reddit_fetch_subreddit_json(sub: str, max_pages: int) -> List[Dict[str, Any]
     
     return items                               # Return all the posts we collected
 
+def subreddit_page_url(sub: str, after: Optional[str]) -> str:
+    """
+    Build the URL of one page of a subreddit's JSON listing (50 posts per page)
+    """
+    url = f"https://www.reddit.com/r/{sub}/.json?limit=50"  # Base URL with 50 posts per page
+    if after:                                  # If we have a pagination token from previous page
+        url += f"&after={after}"               # Add it to get the next page of posts
+    return url
+
+def parse_subreddit_listing(jtxt: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Turn one page of a subreddit's JSON listing into post dictionaries
+    
+    Args:
+        jtxt: The JSON text returned by Reddit
+    
+    Returns:
+        A tuple of (list of post dictionaries, pagination token for the next page or None)
+    """
+    try:
+        # Parse the JSON response from Reddit
+        data = json_loads(jtxt)                # Convert JSON string to Python dictionary
+    except Exception:                          # If JSON parsing failed
+        return [], None                        # Nothing usable on this page
+    
+    items: List[Dict[str, Any]] = []           # Posts found on this page
+    
+    # Process each post in Reddit's JSON structure
+    for ch in data.get('data', {}).get('children', []):  # Navigate to the posts array in JSON
+        d = ch.get('data', {})                 # Get the post data dictionary
+        permalink = d.get('permalink')         # Get the post's permalink (unique path)
+        title = d.get('title', '')             # Get the post title (empty string if missing)
+        
+        # Build the full URL for this post
+        full_url = urljoin("https://www.reddit.com/", permalink) if permalink else None  # Create complete URL
+        
+        # Convert Reddit's timestamp to a readable date format
+        created = d.get('created_utc')         # Reddit stores creation time as Unix timestamp
+        iso_date = None                        # Initialize date as None
+        if isinstance(created, (int, float)):  # If we have a valid timestamp
+            # Convert Unix timestamp to ISO format date string
+            iso_date = datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+        
+        # If we have a valid URL, add this post to our collection
+        if full_url:                           # If we successfully built a URL
+            items.append({                     # Add post information to our list
+                "url": full_url,               # The complete URL to the post
+                "title": title,                # The post's title
+                "date": iso_date,              # The post's creation date
+                "permalink": permalink         # The permalink for getting comments later
+            })
+    
+    # Reddit provides this token to get the next page
+    return items, data.get('data', {}).get('after')
+
 def reddit_fetch_comments_json(permalink: str, limit: int) -> List[str]:
     """
     Get comments from a specific Reddit post using JSON API
@@ -629,16 +1145,81 @@ def reddit_fetch_comments_json(permalink: str, limit: int) -> List[str]:
         List of comment text strings
     """
     # Build the URL for the post's JSON data
-    url = urljoin("https://www.reddit.com", permalink) + ".json?limit=50"  # Create URL for post's JSON
+    url = comments_url(permalink)              # Create URL for post's JSON
+    
+    # Streaming path: parse comments as they arrive and hang up once we have `limit` of them
+    if ijson is not None:
+        try:
+            return stream_comments(url, limit)
+        except Exception:                      # Network or parse trouble: fall back to the normal download
+            pass
     
     # Download the JSON data for this specific post
-    jtxt = safe_request(url, headers={**DEFAULT_HEADERS, "Referer": url}, timeout=12)  # Download with referer header
+    jtxt = safe_request(url, headers={"Referer": url}, timeout=12)  # Download with referer header
     if not jtxt:                               # If download failed
         return []                              # Return empty list
+    return parse_comments_listing(jtxt, limit) # Pull the comment texts out of the JSON
+
+def stream_comments(url: str, limit: int) -> List[str]:
+    """
+    Read up to `limit` comment texts from a post's JSON without downloading the whole thread
+    
+    Args:
+        url: The post's JSON comment listing URL (see comments_url)
+        limit: Maximum number of comments to collect
+    
+    Returns:
+        List of comment text strings (raises on network errors so the caller can fall back)
+    """
+    out: List[str] = []
+    with SESSION.get(url, headers={"Referer": url}, timeout=12, stream=True) as r:
+        r.raise_for_status()                   # Let the caller retry the normal way on HTTP errors
+        r.raw.decode_content = True            # Undo gzip so ijson sees plain JSON
+        # ijson prefixes carry no array indexes: both listings are "item", so count them as they start
+        listing = -1                           # 0 = the post's listing, 1 = the comments listing
+        builder = None                         # Assembles one comment object at a time
+        for prefix, event, value in ijson.parse(r.raw):
+            if prefix == "item" and event == "start_map":
+                listing += 1
+            if listing != 1:                   # Skip the post itself
+                continue
+            if prefix == "item.data.children.item" and event == "start_map":
+                builder = ijson.ObjectBuilder()
+            if builder is None:
+                continue
+            builder.event(event, value)
+            if not (prefix == "item.data.children.item" and event == "end_map"):
+                continue
+            ch, builder = builder.value, None  # One entry of data[1]['data']['children'] is complete
+            if ch.get('kind') != 't1':          # 't1' is Reddit's code for comments
+                continue
+            body = ch.get('data', {}).get('body')
+            if body:
+                out.append(body.strip())
+            if len(out) >= limit:              # Enough comments: stop reading (the rest is never downloaded)
+                break
+    return out
+
+def comments_url(permalink: str) -> str:
+    """
+    Build the URL of a post's JSON comment listing
+    """
+    return urljoin("https://www.reddit.com", permalink) + ".json?limit=50"
+
+def parse_comments_listing(jtxt: str, limit: int) -> List[str]:
+    """
+    Pull up to `limit` comment texts out of a post's JSON comment listing
+    
+    Args:
+        jtxt: The JSON text returned by Reddit
+        limit: Maximum number of comments to collect
     
+    Returns:
+        List of comment text strings
+    """
     try:
         # Parse the JSON response from Reddit
-        data = json.loads(jtxt)                # Convert JSON string to Python data structure
+        data = json_loads(jtxt)                # Convert JSON string to Python data structure
     except Exception:                          # If JSON parsing failed
         return []                              # Return empty list
     
@@ -665,6 +1246,71 @@ def reddit_fetch_comments_json(permalink: str, limit: int) -> List[str]:
     
     return out                                 # Return all the comment texts we collected
 
+def _reddit_collect_sync(sub: str, max_pages: int, comments_per_post_limit: int) -> Tuple[List[Dict[str, Any]], List[List[str]]]:
+    """
+    Download one subreddit's posts and each post's comments, one request at a time
+    
+    Returns:
+        A tuple of (post dictionaries, list of comment texts for each post)
+    """
+    posts = reddit_fetch_subreddit_json(sub, max_pages)  # Fetch posts for this subreddit
+    comments_per_post: List[List[str]] = []
+    for p in posts:                            # Loop through each post
+        try:
+            # Get comments using the post's permalink (if available)
+            comments = reddit_fetch_comments_json(p["permalink"], comments_per_post_limit) if p.get("permalink") else []
+        except Exception:                      # If comment fetching fails for any reason
+            comments = []                      # Just use empty list (no comments)
+        comments_per_post.append(comments)
+        time.sleep(0.1)                        # Sleep for 0.1 seconds between posts (be polite to Reddit)
+    return posts, comments_per_post
+
+async def _reddit_collect_sub(session, sem: "asyncio.Semaphore", limiter: HostRateLimiter, sub: str, max_pages: int,
+                              comments_per_post_limit: int) -> Tuple[List[Dict[str, Any]], List[List[str]]]:
+    """
+    Async version of _reddit_collect_sync: pages one after another (each needs the previous
+    page's "after" token), then every post's comments at the same time (all paced by limiter)
+    """
+    posts: List[Dict[str, Any]] = []
+    after: Optional[str] = None
+    for _ in range(max_pages):                 # Pagination has to stay sequential
+        page_url = subreddit_page_url(sub, after)
+        jtxt = await afetch(session, page_url, sem, timeout=12, max_retries=REDDIT_MAX_RETRIES,
+                            headers={"Referer": f"https://www.reddit.com/r/{sub}/"}, limiter=limiter)
+        if not jtxt:                           # If download failed
+            print(f"  ! r/{sub}: giving up on {page_url} after {REDDIT_MAX_RETRIES} tries")
+            break
+        page_items, after = parse_subreddit_listing(jtxt)
+        if not page_items:                     # If parsing failed or the page was empty
+            break
+        posts.extend(page_items)
+        if not after:                          # No more pages
+            break
+    
+    async def comments_for(p: Dict[str, Any]) -> List[str]:
+        if not p.get("permalink"):             # No permalink means no way to get comments
+            return []
+        url = comments_url(p["permalink"])
+        jtxt = await afetch(session, url, sem, timeout=12, max_retries=REDDIT_MAX_RETRIES,
+                            headers={"Referer": url}, limiter=limiter)
+        if not jtxt:                           # Throttled or failing: say so instead of silently having no comments
+            print(f"  ! r/{sub}: no comments for {url} (failed after {REDDIT_MAX_RETRIES} tries)")
+            return []
+        return parse_comments_listing(jtxt, comments_per_post_limit)
+    
+    return posts, list(await asyncio.gather(*[comments_for(p) for p in posts]))
+
+async def _reddit_collect_all(city_subreddits: Dict[str, str], max_pages: int,
+                              comments_per_post_limit: int) -> List[Tuple[List[Dict[str, Any]], List[List[str]]]]:
+    """
+    Collect every subreddit concurrently over one pooled session (same order as city_subreddits)
+    """
+    sem = asyncio.Semaphore(8)                 # Everything goes to reddit.com, so cap at 8 requests in flight
+    limiter = HostRateLimiter(REDDIT_REQUESTS_PER_SEC)  # ...and pace them, as the sequential loop's sleeps did
+    async with open_async_session() as session:
+        return await asyncio.gather(*[_reddit_collect_sub(session, sem, limiter, sub, max_pages, comments_per_post_limit)
+                                      for sub in city_subreddits.values()])
+
 def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
                              max_pages: int,
                              comments_per_post_limit: int) -> List[Entry]:
@@ -681,16 +1327,19 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
     """
     all_entries: List[Entry] = []              # Initialize list to store everything we collect
     
+    # Download posts and their comments for every subreddit
+    if aiohttp is not None:                    # Concurrent: all subreddits at once, comments fanned out per post
+        results = asyncio.run(_reddit_collect_all(city_subreddits, max_pages, comments_per_post_limit))
+    else:                                      # Sequential fallback, one request at a time
+        results = [_reddit_collect_sync(sub, max_pages, comments_per_post_limit) for sub in city_subreddits.values()]
+    
     # Go through each city and its corresponding subreddit
-    for city, sub in city_subreddits.items(): # Loop through city -> subreddit mappings
-        print(f"Scraping subreddit: r/{sub} for {city}")  # Show which city/subreddit we're working on
-        
-        # Get posts from this subreddit using Reddit's JSON API
-        posts = reddit_fetch_subreddit_json(sub, max_pages)  # Fetch posts for this subreddit
+    for (city, sub), (posts, comments_per_post) in zip(city_subreddits.items(), results):
+        print(f"Scraped subreddit: r/{sub} for {city}")  # Show which city/subreddit we worked on
         print(f"  -> {len(posts)} posts")      # Show how many posts we successfully got
         
         # Process each post we found
-        for p in posts:                        # Loop through each post
+        for p, comments in zip(posts, comments_per_post):  # Loop through each post and its comments
             # Create an Entry object for the post itself
             all_entries.append(Entry(
                 source="RedditPost",           # Mark this as a Reddit post
@@ -702,13 +1351,6 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
                 cities=[city],                 # Tag this with the city this subreddit represents
             ))
             
-            # Now get comments for this post
-            try:
-                # Get comments using the post's permalink (if available)
-                comments = reddit_fetch_comments_json(p.get("permalink", ""), comments_per_post_limit) if p.get("permalink") else []
-            except Exception:                  # If comment fetching fails for any reason
-                comments = []                  # Just use empty list (no comments)
-            
             # Create an Entry object for each comment
             for c in comments:                 # Loop through each comment we got
                 all_entries.append(Entry(
@@ -720,9 +1362,6 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
                     text=c,                    # The actual comment text
                     cities=[city],             # Tag with the city this subreddit represents
                 ))
-            
-            # Wait a bit before processing the next post (reduced delay for massive data collection)
-            time.sleep(0.1)                    # Sleep for 0.1 seconds between posts (reduced for speed)
     
     return all_entries                         # Return all posts and comments we collected
 
@@ -730,18 +1369,16 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
 # NATURAL LANGUAGE PROCESSING FUNCTIONS
 # =========================
 
-def detect_cities_in_text(text: str, title: str, nlp, known_cities: Set[str]) -> List[str]:
+def match_city_synonyms(text: str, title: str) -> Set[str]:
     """
-    Analyze text to find which cities are mentioned using AI and pattern matching
+    Find the cities whose names or nicknames (CITY_SYNONYMS) appear in the text - the cheap first step
     
     Args:
         text: The main article text to analyze
         title: The article title to analyze
-        nlp: The spaCy language model for AI analysis
-        known_cities: Set of city names we're looking for
     
     Returns:
-        List of city names found in the text
+        Set of canonical city names found
     """
     found: Set[str] = set()                    # Use a set to automatically avoid duplicate city names
     
@@ -749,14 +1386,69 @@ def detect_cities_in_text(text: str, title: str, nlp, known_cities: Set[str]) ->
     blob = (title + " " + text).lower()        # Merge title and text, make lowercase for consistent matching
     
     # Method 1: Look for city synonyms and nicknames in the text
-    for k, canonical in CITY_SYNONYMS.items():  # Loop through our city synonyms dictionary
-        if k in blob:                          # If this synonym appears anywhere in the text
+    # Only whole-word matches count (so "la" inside "plan" is not Los Angeles)
+    if _CITY_AC is not None:                   # Fast path: one automaton pass finds every synonym
+        for end, (k, canonical) in _CITY_AC.iter(blob):  # Each hit yields (end index, (synonym, canonical city))
+            start = end - len(k) + 1           # Index where the synonym starts
+            if start > 0 and _is_word_char(blob[start - 1]):  # Part of a longer word on the left
+                continue
+            if end + 1 < len(blob) and _is_word_char(blob[end + 1]):  # Part of a longer word on the right
+                continue
             found.add(canonical)               # Add the canonical city name to our results
+    else:
+        for m in CITY_PATTERN.finditer(blob):  # One compiled regex pass over the text
+            found.add(CITY_SYNONYMS[m.group(1).lower()])  # Add the canonical city name to our results
+    
+    return found
+
+def needs_city_nlp(found: Set[str], text: str, title: str, known_cities: Set[str]) -> bool:
+    """
+    Decide whether the (slow) spaCy step could still add anything after synonym matching
+    
+    Args:
+        found: Cities already found by match_city_synonyms
+        text: The main article text
+        title: The article title
+        known_cities: Set of city names we're looking for
+    
+    Returns:
+        False if every known city is already found, or if the words spaCy would read (the
+        first 200) have no capitalised word that could be a place name; True otherwise
+    """
+    if known_cities and known_cities <= found:  # Nothing left for spaCy to add
+        return False
+    return PROPER_NOUN_PATTERN.search(truncate_words(title + " " + text, 200)) is not None  # Any "Name"-looking word?
+
+def detect_cities_in_text(text: str, title: str, nlp, known_cities: Set[str], doc=None,
+                          found: Optional[Set[str]] = None) -> List[str]:
+    """
+    Analyze text to find which cities are mentioned using AI and pattern matching
+    
+    Args:
+        text: The main article text to analyze
+        title: The article title to analyze
+        nlp: The spaCy language model for AI analysis
+        known_cities: Set of city names we're looking for
+        doc: Already-processed spaCy doc for this text (from nlp.pipe); made here if needed and not given
+        found: Result of match_city_synonyms for this text, if the caller already has it
+    
+    Returns:
+        List of city names found in the text
+    """
+    # Method 1: Look for city synonyms and nicknames in the text
+    found = match_city_synonyms(text, title) if found is None else set(found)
+    
+    # Skip the expensive AI step when it can't change the answer
+    if not needs_city_nlp(found, text, title, known_cities):
+        return sorted(found)                   # Convert set to sorted list
     
     # Method 2: Use AI (spaCy) to find geographic entities
     try:
         # Use spaCy NLP to analyze the text (truncate first to save processing time)
-        doc = nlp(truncate_words(title + " " + text, 200))  # Process first 200 words with AI
+        if doc is None:                        # Caller didn't batch this text through nlp.pipe
+            doc = nlp(truncate_words(title + " " + text, 200))  # Process first 200 words with AI
+        
+        known_lower: Optional[Dict[str, str]] = None  # Lowercase name -> city, built on first use
         
         # Look through all the named entities that spaCy identified
         for ent in doc.ents:                   # Loop through each entity found by AI
@@ -767,11 +1459,13 @@ def detect_cities_in_text(text: str, title: str, nlp, known_cities: Set[str]) ->
                 # Check if this matches any of our known city synonyms
                 if name in CITY_SYNONYMS:      # If AI found a name that's in our synonyms
                     found.add(CITY_SYNONYMS[name])  # Add the canonical city name
-        else:
-                    # Check if it directly matches any of our known city names
-                    for c in known_cities:     # Loop through our list of cities we care about
-                        if name == c.lower():  # If AI entity matches a known city (case-insensitive)
-                            found.add(c)       # Add this city to our results
+                else:
+                    # Check if it directly matches any of our known city names (case-insensitive)
+                    if known_lower is None:    # One dictionary per call instead of a scan per entity
+                        known_lower = {c.lower(): c for c in known_cities}
+                    c = known_lower.get(name)  # The known city this entity names, if any
+                    if c:
+                        found.add(c)           # Add this city to our results
     except Exception:                          # If NLP processing fails for any reason
         pass                                   # Just continue with what we found from synonym matching
     
@@ -789,16 +1483,22 @@ def extract_candidate_keywords(text: str, nlp) -> List[str]:
     Returns:
         List of important phrases found in the text
     """
-    doc = nlp(text)                            # Process the text with spaCy AI model
-    candidates = set()                         # Use a set to automatically avoid duplicate phrases
+    return list(keywords_from_doc(nlp(text)))  # Process the text with spaCy AI model
+
+def keywords_from_doc(doc) -> Set[str]:
+    """
+    Collect the distinct noun phrases of an already-processed spaCy doc
     
-    # spaCy identifies "noun chunks" - meaningful phrases like "the housing crisis" or "public transportation"
-    for chunk in doc.noun_chunks:              # Loop through each noun phrase identified by AI
-        cleaned = chunk.text.strip().lower()  # Clean up the phrase (remove whitespace, make lowercase)
-        if len(cleaned.split()) > 0:           # Make sure the phrase isn't empty after cleaning
-            candidates.add(cleaned)            # Add this phrase to our set of keywords
+    Args:
+        doc: A spaCy Doc (from nlp(text) or nlp.pipe)
     
-    return list(candidates)                    # Convert set back to list and return
+    Returns:
+        Set of important phrases found in the text (each phrase once)
+    """
+    # spaCy identifies "noun chunks" - meaningful phrases like "the housing crisis" or "public transportation"
+    # Clean each one (remove whitespace, make lowercase) and keep the non-empty ones; the set drops duplicates
+    cleaned = (chunk.text.strip().lower() for chunk in doc.noun_chunks)
+    return {c for c in cleaned if c}
 
 def top_keyword_counts(entries: List[Entry], nlp, limit: int) -> List[Tuple[str, int]]:
     """
@@ -814,14 +1514,13 @@ def top_keyword_counts(entries: List[Entry], nlp, limit: int) -> List[Tuple[str,
     """
     counter = Counter()                        # Counter object keeps track of how many times we see each keyword
     
-    # Go through every piece of content we collected
-    for e in entries:                          # Loop through each Entry (article/post/comment)
-        # Combine title and text, but truncate to save processing time
-        text = truncate_words(e.title + " " + e.text, 120)  # Merge title and text, limit to 120 words
-        
-        # Extract keywords from this text using AI
-        for kw in extract_candidate_keywords(text, nlp):  # Get keywords from this piece of content
-            counter[kw] += 1                   # Increment the count for this keyword
+    # Combine title and text of every piece of content, truncated to save processing time
+    texts = (truncate_words(e.title + " " + e.text, 120) for e in entries)  # Limit each to 120 words
+    
+    # Run the texts through spaCy in batches (much less per-call overhead than one nlp() call each)
+    # Noun chunks only need the tagger and parser, so skip named-entity recognition and lemmas
+    for doc in nlp.pipe(texts, batch_size=64, disable=["ner", "lemmatizer"]):
+        counter.update(keywords_from_doc(doc))  # Count each keyword once per piece of content
     
     # Return the most common keywords with their counts
     return counter.most_common(limit)          # Get the top 'limit' most frequent keywords
@@ -830,6 +1529,66 @@ def top_keyword_counts(entries: List[Entry], nlp, limit: int) -> List[Tuple[str,
 # OPENAI INTEGRATION FUNCTIONS
 # =========================
 
+# On-disk cache of OpenAI answers, keyed by a hash of (model, messages):
+# rerunning over the same data reuses earlier answers instead of paying for them again
+_LLM_CACHE_CONN: Optional[sqlite3.Connection] = None
+_LLM_CACHE_LOCK = threading.Lock()          # One thread at a time talks to SQLite
+
+def _llm_cache_conn() -> Optional[sqlite3.Connection]:
+    """
+    Open (once) the SQLite file that stores OpenAI answers; None if caching is off or unavailable
+    """
+    global _LLM_CACHE_CONN
+    if _LLM_CACHE_CONN is None and LLM_CACHE_PATH:
+        try:
+            conn = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)")
+            conn.commit()
+            _LLM_CACHE_CONN = conn
+        except Exception:                      # Caching is best-effort
+            return None
+    return _LLM_CACHE_CONN
+
+def llm_cache_key(messages: List[Dict[str, str]]) -> str:
+    """
+    Hash the model name and the exact messages into a cache key
+    """
+    raw = json.dumps([OPENAI_MODEL, messages], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+def llm_cache_get(messages: List[Dict[str, str]]) -> Optional[str]:
+    """
+    Return the saved OpenAI answer (response text) for these messages, or None
+    """
+    with _LLM_CACHE_LOCK:
+        conn = _llm_cache_conn()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT response FROM cache WHERE key=?", (llm_cache_key(messages),)).fetchone()
+    return row[0] if row else None
+
+def llm_cache_put(messages: List[Dict[str, str]], content: str) -> None:
+    """
+    Save an OpenAI answer (response text) for these messages
+    """
+    with _LLM_CACHE_LOCK:
+        conn = _llm_cache_conn()
+        if conn is None:
+            return
+        conn.execute("INSERT OR REPLACE INTO cache (key, response, ts) VALUES (?, ?, ?)",
+                     (llm_cache_key(messages), content, int(time.time())))
+        conn.commit()
+
+def completion_text(raw) -> str:
+    """
+    Pull the answer text out of a raw chat-completion response (from `.with_raw_response.create`)
+    
+    Decodes the response body bytes directly (orjson when available) instead of having the SDK
+    build its full pydantic response object first
+    """
+    return json_loads(raw.content)["choices"][0]["message"]["content"]
+
+@lru_cache(maxsize=1)                          # Build the client once; every call then shares its connection pool
 def try_get_openai_client():
     """
     Try to create an OpenAI client if we have an API key available
@@ -884,20 +1643,25 @@ def openai_top_topics(keyword_counts: List[Tuple[str, int]],
         )
     }
     
+    messages = [{"role": "system", "content": "Return only valid JSON."}, prompt]  # System message + our prompt
+    
     try:
-        # Send the request to OpenAI's API
-        resp = client.chat.completions.create(
-            model=OPENAI_MODEL,                # Use the AI model specified in our config
-            messages=[{"role": "system", "content": "Return only valid JSON."}, prompt],  # System message + our prompt
-            temperature=0.2,                   # Low temperature for more consistent/focused results
-            response_format={"type": "json_object"},  # Force OpenAI to return valid JSON
-        )
-        
-        # Extract the response content from OpenAI
-        content = resp.choices[0].message.content  # Get the AI's response text
+        content = llm_cache_get(messages)      # Same question asked on an earlier run?
+        if content is None:                    # No: ask OpenAI
+            # Send the request to OpenAI's API
+            raw = client.chat.completions.with_raw_response.create(
+                model=OPENAI_MODEL,            # Use the AI model specified in our config
+                messages=messages,             # System message + our prompt
+                temperature=0.2,               # Low temperature for more consistent/focused results
+                response_format={"type": "json_object"},  # Force OpenAI to return valid JSON
+            )
+            
+            # Extract the response content from OpenAI
+            content = completion_text(raw)     # Get the AI's response text
+            llm_cache_put(messages, content)   # Save it for the next run
         
         # Parse the JSON response into Python data
-        data = json.loads(content)             # Convert JSON string to Python dictionary
+        data = json_loads(content)             # Convert JSON string to Python dictionary
         
         # Return the topics array from the response
         return data.get("topics", [])          # Get the 'topics' key, or empty list if missing
@@ -905,6 +1669,56 @@ def openai_top_topics(keyword_counts: List[Tuple[str, int]],
     except Exception:                          # If anything goes wrong (API error, JSON parsing, etc.)
         return []                              # Return empty list (caller will use fallback method)
 
+# Neutral scores, built once; nothing downstream modifies a score dict, so every fallback shares this one
+_DEFAULT_CITY_SCORE: Dict[str, Any] = {
+    "overall_health": 50,                      # Default overall score of 50/100
+    "category_scores": {k: {"score": 50, "rationale": "insufficient data"} for k in CIVIC_DIMENSIONS},  # 50/100 for each dimension
+    "top_issues": [],                          # Empty issues list
+}
+
+def default_city_score() -> Dict[str, Any]:
+    """
+    Neutral scores used when OpenAI is unavailable or a request fails (shared, treat as read-only)
+    """
+    return _DEFAULT_CITY_SCORE
+
+# The fixed part of the city-scoring prompt, built once instead of once per city
+CITY_SCORE_INSTRUCTIONS = (
+    "Given the following short snippets from recent news and social discussions, "  # Explain the input
+    "produce a structured assessment.\n\n"                                          # Ask for structured output
+    "Return strict JSON with:\n"                                                    # Specify output format
+    "  - overall_health (integer 0-100)\n"                                          # Overall score
+    "  - category_scores: object with keys affordability, services, safety, opportunity, culture, "  # Category scores
+    "environment, transportation, governance, housing, economy, education, health; each value is "   # More categories
+    "an object { score: integer 0-100, rationale: short string }\n"                                # Score format
+    "  - top_issues: array of 10 items { name: string, why_it_matters: string }\n"                 # Issues format
+    "Guidance: higher score means better civic health signal net of sentiment. "                   # Scoring guidance
+    "Weigh recency implied by discussion (no dates provided) and balance across sources.\n\n"      # More guidance
+    "Snippets:\n"                                                                                   # The data follows
+)
+
+def city_score_messages(city: str, snippets: List[str]) -> List[Dict[str, str]]:
+    """
+    Build the chat messages that ask OpenAI to score one city
+    
+    Args:
+        city: Name of the city to analyze
+        snippets: Short text excerpts about this city from news/social media
+    
+    Returns:
+        The system + user messages for the chat completion request
+    """
+    # Combine the text snippets (but limit to save on API costs); islice avoids copying the list
+    bundle = "\n\n".join(islice(snippets, CITY_DOCS_PER_MODEL_CALL))  # Join snippets with double newlines, limit quantity
+    
+    # Create a detailed prompt asking OpenAI to analyze this specific city
+    prompt = {
+        "role": "user",                        # We are the user making a request
+        # One join of the city line, the shared instructions and the data to analyze
+        "content": "".join((f"You are scoring civic health for the city: {city}.\n", CITY_SCORE_INSTRUCTIONS, bundle)),
+    }
+    return [{"role": "system", "content": "Return only valid JSON."}, prompt]  # System instruction + our prompt
+
 def openai_score_city(city: str, snippets: List[str]) -> Dict[str, Any]:
     """
     Use OpenAI to analyze and score a city's civic health across multiple dimensions
@@ -920,54 +1734,283 @@ def openai_score_city(city: str, snippets: List[str]) -> Dict[str, Any]:
     
     # If we don't have OpenAI available, return default neutral scores
     if client is None:                         # If no OpenAI client available
-        return {                               # Return a default scoring structure
-            "overall_health": 50,              # Default overall score of 50/100
-            "category_scores": {k: {"score": 50, "rationale": "insufficient data"} for k in CIVIC_DIMENSIONS},  # 50/100 for each dimension
-            "top_issues": [],                  # Empty issues list
-        }
-    
-    # Combine the text snippets (but limit to save on API costs)
-    bundle = "\n\n".join(snippets[:CITY_DOCS_PER_MODEL_CALL])  # Join snippets with double newlines, limit quantity
-    
-    # Create a detailed prompt asking OpenAI to analyze this specific city
-    prompt = {
-        "role": "user",                        # We are the user making a request
-        "content": (                           # The detailed analysis request
-            f"You are scoring civic health for the city: {city}.\n"  # Specify which city to analyze
-            "Given the following short snippets from recent news and social discussions, "  # Explain the input
-            "produce a structured assessment.\n\n"                                          # Ask for structured output
-            "Return strict JSON with:\n"                                                    # Specify output format
-            "  - overall_health (integer 0-100)\n"                                          # Overall score
-            "  - category_scores: object with keys affordability, services, safety, opportunity, culture, "  # Category scores
-            "environment, transportation, governance, housing, economy, education, health; each value is "   # More categories
-            "an object { score: integer 0-100, rationale: short string }\n"                                # Score format
-            "  - top_issues: array of 10 items { name: string, why_it_matters: string }\n"                 # Issues format
-            "Guidance: higher score means better civic health signal net of sentiment. "                   # Scoring guidance
-            "Weigh recency implied by discussion (no dates provided) and balance across sources.\n\n"      # More guidance
-            "Snippets:\n" + bundle                                                                          # The actual data to analyze
-        )
-    }
+        return default_city_score()            # Return a default scoring structure
     
+    messages = city_score_messages(city, snippets)  # System instruction + our prompt
     try:
-        # Send the request to OpenAI's API
-        resp = client.chat.completions.create(
-            model=OPENAI_MODEL,                # Use the AI model specified in our config
-            messages=[{"role": "system", "content": "Return only valid JSON."}, prompt],  # System instruction + our prompt
-            temperature=0.2,                   # Low temperature for consistent, focused results
-            response_format={"type": "json_object"},  # Force OpenAI to return valid JSON format
-        )
+        content = llm_cache_get(messages)      # Same question asked on an earlier run?
+        if content is None:                    # No: ask OpenAI
+            # Send the request to OpenAI's API
+            raw = client.chat.completions.with_raw_response.create(
+                model=OPENAI_MODEL,            # Use the AI model specified in our config
+                messages=messages,             # System instruction + our prompt
+                temperature=0.2,               # Low temperature for consistent, focused results
+                response_format={"type": "json_object"},  # Force OpenAI to return valid JSON format
+            )
+            content = completion_text(raw)     # Extract the AI's response text
+            llm_cache_put(messages, content)   # Save it for the next run
         
         # Parse and return the response from OpenAI
-        content = resp.choices[0].message.content  # Extract the AI's response text
-        return json.loads(content)             # Parse JSON and return as Python dictionary
+        return json_loads(content)             # Parse JSON and return as Python dictionary
         
     except Exception:                          # If anything goes wrong (API error, JSON parsing, network, etc.)
-        # Return default neutral scores as fallback
-        return {
-            "overall_health": 50,              # Default overall score
-            "category_scores": {k: {"score": 50, "rationale": "insufficient data"} for k in CIVIC_DIMENSIONS},  # Default category scores
-            "top_issues": [],                  # Empty issues list
-        }
+        return default_city_score()            # Return default neutral scores as fallback
+
+def try_get_async_openai_client():
+    """
+    Like try_get_openai_client, but returns the asyncio client (AsyncOpenAI) or None
+    """
+    if not OPENAI_API_KEY:                     # If no API key is available
+        return None
+    try:
+        from openai import AsyncOpenAI         # Import OpenAI's async client (might fail if not installed)
+        http_client = None                     # None = the SDK's default (HTTP/1.1) connection pool
+        if httpx is not None:                  # With h2 installed, multiplex all requests over one connection
+            http_client = httpx.AsyncClient(http2=True,
+                                            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+                                            timeout=httpx.Timeout(60.0, connect=10.0))
+        # Retries are handled by openai_score_city_async so they can follow the rate limiter
+        # (client.close() also closes http_client)
+        return AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0, http_client=http_client)
+    except Exception:                          # If import fails or client creation fails
+        return None
+
+class AsyncRateLimiter:
+    """
+    Token bucket for OpenAI's requests-per-minute and tokens-per-minute limits (one event loop only)
+    """
+
+    def __init__(self, requests_per_min: int, tokens_per_min: int):
+        self.rpm = max(1, requests_per_min)   # Bucket sizes = one minute's allowance
+        self.tpm = max(1, tokens_per_min)
+        self.requests = float(self.rpm)        # Start full
+        self.tokens = float(self.tpm)
+        self.updated = time.monotonic()        # When the buckets were last refilled
+        self.paused_until = 0.0                # Set from retry-after on a 429
+        self.lock = asyncio.Lock()             # Waiters are served in arrival order
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60.0)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60.0)
+
+    async def acquire(self, est_tokens: int) -> None:
+        """
+        Wait until one request of about est_tokens tokens fits in both buckets, then take it
+        """
+        est_tokens = min(est_tokens, self.tpm)  # A huge prompt must still get through eventually
+        async with self.lock:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0:
+                    self._refill()
+                    if self.requests >= 1 and self.tokens >= est_tokens:
+                        self.requests -= 1
+                        self.tokens -= est_tokens
+                        return
+                    # Time until enough of both has trickled back in
+                    wait = max((1 - self.requests) * 60.0 / self.rpm,
+                               (est_tokens - self.tokens) * 60.0 / self.tpm, 0.05)
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold every caller for `seconds` (OpenAI said to back off)
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers) -> None:
+        """
+        Never assume more capacity than OpenAI's x-ratelimit-remaining-* headers report
+        """
+        try:
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            self._refill()
+            if remaining_requests is not None:
+                self.requests = min(self.requests, float(remaining_requests))
+            if remaining_tokens is not None:
+                self.tokens = min(self.tokens, float(remaining_tokens))
+        except (AttributeError, TypeError, ValueError):  # Missing or odd headers: keep our own estimate
+            pass
+
+def openai_retry_delay(exc: Exception, attempt: int) -> Optional[float]:
+    """
+    How long to wait before retrying a failed OpenAI request, or None if retrying won't help
+    
+    Args:
+        exc: The exception raised by the OpenAI client
+        attempt: How many tries have been made so far (1 = first try failed)
+    
+    Returns:
+        Seconds to wait (retry-after when OpenAI sends it, else exponential backoff with jitter), or None
+    """
+    status = getattr(exc, "status_code", None)
+    retryable = status in (408, 409, 429) or (isinstance(status, int) and status >= 500) \
+        or type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+    if not retryable:                          # e.g. 400 bad request, 401 bad key
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):            # retry-after given as an HTTP date: use backoff instead
+        pass
+    return min(60.0, 2.0 ** attempt) + random.random()
+
+async def openai_score_city_async(client, city: str, snippets: List[str], sem: "asyncio.Semaphore",
+                                  limiter: Optional[AsyncRateLimiter] = None) -> Dict[str, Any]:
+    """
+    Async version of openai_score_city: many cities can wait on OpenAI at the same time
+    
+    Args:
+        client: An AsyncOpenAI client
+        city: Name of the city to analyze
+        snippets: Short text excerpts about this city from news/social media
+        sem: Semaphore limiting how many requests are in flight at once
+        limiter: Optional rate limiter shared by all cities (requests/tokens per minute)
+    
+    Returns:
+        Dictionary containing health scores, rationales, and top issues for the city
+    """
+    messages = city_score_messages(city, snippets)
+    content = llm_cache_get(messages)          # Same question asked on an earlier run?
+    if content is None:                        # No: ask OpenAI
+        # Rough token estimate (~4 characters per token) plus room for the answer
+        est_tokens = sum(len(m["content"]) for m in messages) // 4 + 1000
+        for attempt in range(1, OPENAI_MAX_ATTEMPTS + 1):
+            try:
+                async with sem:                # Wait for a free request slot
+                    if limiter is not None:
+                        await limiter.acquire(est_tokens)
+                    raw = await client.chat.completions.with_raw_response.create(
+                        model=OPENAI_MODEL,
+                        messages=messages,
+                        temperature=0.2,
+                        response_format={"type": "json_object"},
+                    )
+                if limiter is not None:
+                    limiter.update_from_headers(raw.headers)
+                content = completion_text(raw)
+                llm_cache_put(messages, content)  # Save it for the next run
+                break
+            except Exception as exc:           # Rate limit, server error, network, bad request, ...
+                delay = openai_retry_delay(exc, attempt)
+                if delay is None or attempt == OPENAI_MAX_ATTEMPTS:
+                    # Not silent: a neutral score here means "no answer", not a real 50/100
+                    print(f"OpenAI scoring failed for {city} after {attempt} attempt(s): {exc}; using neutral scores")
+                    return default_city_score()
+                if limiter is not None and getattr(exc, "status_code", None) == 429:
+                    limiter.pause(delay)       # Everyone backs off, not just this city
+                await asyncio.sleep(delay)
+    try:
+        return json_loads(content)             # Parse JSON and return as Python dictionary
+    except Exception:                          # Malformed JSON is not worth retrying
+        return default_city_score()
+
+async def _score_cities_async(client, city_snippets: List[Tuple[str, List[str]]]) -> List[Dict[str, Any]]:
+    """
+    Score every city concurrently (at most OPENAI_CONCURRENCY requests at once), results in input order
+    """
+    sem = asyncio.Semaphore(OPENAI_CONCURRENCY)
+    limiter = AsyncRateLimiter(OPENAI_RPM, OPENAI_TPM)  # Created inside the running event loop
+    try:
+        return await asyncio.gather(*[openai_score_city_async(client, c, snips, sem, limiter) for c, snips in city_snippets])
+    finally:
+        await client.close()                   # Close the client's connection pool inside the event loop
+
+def openai_score_cities_batch(city_snippets: List[Tuple[str, List[str]]]) -> List[Dict[str, Any]]:
+    """
+    Score all cities with one OpenAI Batch API job (50% cheaper; waits until the job finishes)
+    
+    Args:
+        city_snippets: List of (city name, snippets) pairs
+    
+    Returns:
+        One score dictionary per city, in the same order (neutral defaults for any that failed)
+    """
+    scores = [default_city_score() for _ in city_snippets]  # Start from defaults, fill in what comes back
+    client = try_get_openai_client()           # Batch jobs use the normal (sync) client
+    if client is None or not city_snippets:    # No OpenAI available, or nothing to score
+        return scores
+    
+    try:
+        # Cities answered on an earlier run come straight from the cache; only the rest go into the batch
+        all_messages = [city_score_messages(city, snippets) for city, snippets in city_snippets]
+        todo: List[int] = []                   # Positions of the cities we still need to ask about
+        for i, messages in enumerate(all_messages):
+            cached = llm_cache_get(messages)
+            if cached is None:
+                todo.append(i)
+            else:
+                try:
+                    scores[i] = json_loads(cached)
+                except Exception:
+                    todo.append(i)
+        if not todo:                           # Everything was cached
+            return scores
+        
+        # One JSON line per city; custom_id is the city's position so results can be matched back
+        lines = [json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": OPENAI_MODEL,
+                "messages": all_messages[i],
+                "temperature": 0.2,
+                "response_format": {"type": "json_object"},
+            },
+        }) for i in todo]
+        
+        # Upload the requests and start the batch job
+        upload = client.files.create(file=("city_scores.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h")
+        print(f"Submitted OpenAI batch {batch.id} for {len(lines)} cities; waiting for it to finish...")
+        
+        # Wait for the job to finish (or fail)
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(OPENAI_BATCH_POLL_SEC)
+            batch = client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            print(f"OpenAI batch ended with status {batch.status}; using default scores.")
+            return scores
+        
+        # Read one result line per city and put each score in its city's slot
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            try:
+                row = json_loads(line)
+                i = int(row["custom_id"])
+                content = row["response"]["body"]["choices"][0]["message"]["content"]
+                scores[i] = json_loads(content)
+                llm_cache_put(all_messages[i], content)  # Save it for the next run
+            except Exception:                  # A failed or malformed line keeps that city's default
+                continue
+    except Exception:                          # Upload/API failure: keep the defaults
+        pass
+    return scores
+
+def score_all_cities(city_snippets: List[Tuple[str, List[str]]]) -> List[Dict[str, Any]]:
+    """
+    Score many cities with OpenAI, concurrently when the async client is available
+    
+    Args:
+        city_snippets: List of (city name, snippets) pairs
+    
+    Returns:
+        One score dictionary per city, in the same order as city_snippets
+    """
+    if OPENAI_USE_BATCH:                       # Offline mode: one Batch API job for all cities
+        return openai_score_cities_batch(city_snippets)
+    
+    client = try_get_async_openai_client()     # Async client lets requests overlap
+    if client is None:                         # No async client: one city at a time (or default scores)
+        return [openai_score_city(c, snips) for c, snips in city_snippets]
+    return asyncio.run(_score_cities_async(client, city_snippets))
 
 # =========================
 # OUTPUT FORMATTING FUNCTIONS
@@ -984,13 +2027,27 @@ def print_header(title: str):
     print(title)                               # Print the title text
     print("=" * 80)                           # Print another line of 80 equals signs
 
-def print_topics(topics: List[Dict[str, Any]]):
+def emit_lines(lines: List[str]):
     """
-    Print the list of top topics in a nicely formatted way
+    Write a block of output lines with one stdout call instead of one print() per line
+    
+    Args:
+        lines: The lines to write (without trailing newlines)
+    """
+    if lines:                                  # Nothing to write for an empty block
+        sys.stdout.write("\n".join(lines) + "\n")  # Join once, write once
+
+def format_topics(topics: List[Dict[str, Any]]) -> List[str]:
+    """
+    Format the list of top topics as output lines
     
     Args:
         topics: List of topic dictionaries from OpenAI analysis
+    
+    Returns:
+        The formatted lines, ready for emit_lines
     """
+    lines: List[str] = []                      # Output lines for all topics
     # Go through the first 20 topics (or fewer if we don't have 20)
     for i, t in enumerate(topics[:20], 1):     # Loop with index starting at 1, limit to 20 topics
         name = t.get("name", "")               # Get the topic name (empty string if missing)
@@ -998,45 +2055,69 @@ def print_topics(topics: List[Dict[str, Any]]):
         signals = ", ".join(t.get("signals", []))  # Join the civic signals with commas (empty if missing)
         reps = ", ".join(t.get("representative_phrases", [])[:6])  # Get up to 6 example phrases, join with commas
         
-        # Print the topic information in a formatted way
-        print(f"{i}. {name}")                  # Print topic number and name
+        # Add the topic information in a formatted way
+        lines.append(f"{i}. {name}")           # Topic number and name
         if desc:                               # If we have a description
-            print(f"   - {desc}")              # Print the description with indentation
+            lines.append(f"   - {desc}")       # The description with indentation
         if signals:                            # If we have civic signals
-            print(f"   - Signals: {signals}")  # Print the signals with indentation
+            lines.append(f"   - Signals: {signals}")  # The signals with indentation
         if reps:                               # If we have representative phrases
-            print(f"   - Phrases: {reps}")     # Print the phrases with indentation
+            lines.append(f"   - Phrases: {reps}")  # The phrases with indentation
+    return lines
 
-def print_city_score(city: str, score: Dict[str, Any]):
+def print_topics(topics: List[Dict[str, Any]]):
     """
-    Print a city's health score and analysis in a nicely formatted way
+    Print the list of top topics in a nicely formatted way
+    
+    Args:
+        topics: List of topic dictionaries from OpenAI analysis
+    """
+    emit_lines(format_topics(topics))          # Format everything, then write it in one go
+
+def format_city_score(city: str, score: Dict[str, Any]) -> List[str]:
+    """
+    Format a city's health score and analysis as output lines
     
     Args:
         city: Name of the city being analyzed
         score: Dictionary containing the city's scores and analysis from OpenAI
+    
+    Returns:
+        The formatted lines, ready for emit_lines
     """
     # Get the overall health score for this city
     overall = score.get("overall_health", "NA")  # Get overall score, use "NA" if missing
-    print(f"\n{city}: Health Score = {overall}/100")  # Print city name and overall score
+    lines = ["", f"{city}: Health Score = {overall}/100"]  # Blank line, then city name and overall score
     
     # Get the detailed category scores
     cats = score.get("category_scores", {})    # Get the category scores dictionary
     
-    # Print each civic dimension score in a formatted table
+    # Add each civic dimension score in a formatted table
     for k in CIVIC_DIMENSIONS:                 # Loop through each civic dimension we track
         if k in cats:                          # If we have data for this dimension
             v = cats[k]                        # Get the score and rationale for this dimension
-            # Print formatted line: "Dimension Name    Score/100  | Rationale"
-            print(f"  - {k.title():<15} {v.get('score','NA'):>3}/100  | {truncate_words(v.get('rationale',''), 22)}")
+            # Formatted line: "Dimension Name    Score/100  | Rationale"
+            lines.append(f"  - {k.title():<15} {v.get('score','NA'):>3}/100  | {truncate_words(v.get('rationale',''), 22)}")
     
-    # Print the top issues identified for this city
+    # Add the top issues identified for this city
     issues = score.get("top_issues", [])       # Get the list of top issues
     if issues:                                 # If we have issues to display
-        print("  Top Issues:")                 # Print section header
-        # Print each issue with a number
+        lines.append("  Top Issues:")          # Section header
+        # Add each issue with a number
         for j, it in enumerate(issues[:10], 1):  # Loop through up to 10 issues, numbered starting at 1
-            # Print issue number, name, and why it matters (truncated)
-            print(f"    {j}. {it.get('name','')} — {truncate_words(it.get('why_it_matters',''), 28)}")
+            # Issue number, name, and why it matters (truncated)
+            lines.append(f"    {j}. {it.get('name','')} — {truncate_words(it.get('why_it_matters',''), 28)}")
+    return lines
+
+def print_city_score(city: str, score: Dict[str, Any]):
+    """
+    Print a city's health score and analysis in a nicely formatted way
+    
+    Args:
+        city: Name of the city being analyzed
+        score: Dictionary containing the city's scores and analysis from OpenAI
+    """
+    emit_lines(format_city_score(city, score))  # Format everything, then write it in one go
 
 # =========================
 # MAIN PROGRAM EXECUTION
@@ -1047,6 +2128,14 @@ def main():
     The main function that runs our entire civic health analysis pipeline
     This orchestrates all the steps from data collection to final analysis
     """
+    # Parse CLI flags
+    parser = argparse.ArgumentParser()         # Create an argument parser for command-line flags
+    parser.add_argument("--batch", action="store_true",  # Offline scoring through OpenAI's Batch API
+                        help="Score cities with one OpenAI Batch API job (half price, can take up to 24h); same as OPENAI_BATCH=1")
+    args = parser.parse_args()                 # Parse the CLI arguments
+    global OPENAI_USE_BATCH
+    OPENAI_USE_BATCH = OPENAI_USE_BATCH or args.batch  # The env var stays as an alias for the flag
+    
     # Step 1: Load the AI language model for text processing
     nlp = spacy.load("en_core_web_md")         # Load spaCy's medium English model with word vectors
     
@@ -1060,6 +2149,11 @@ def main():
     # Step 4: Combine all our collected data into one master list
     all_entries: List[Entry] = news_entries + reddit_entries  # Merge news articles with Reddit posts/comments
     
+    # Split the content by type once; later steps reuse these lists instead of re-scanning all_entries
+    by_source: Dict[str, List[Entry]] = {"News": [], "RedditPost": [], "RedditComment": []}
+    for e in all_entries:
+        by_source.setdefault(e.source, []).append(e)
+    
     # Print summary statistics of what we collected
     print(f"\nTotals -> News articles: {len(news_entries)} | Reddit items (posts+comments): {len(reddit_entries)} | Overall: {len(all_entries)}")
 
@@ -1068,16 +2162,31 @@ def main():
     known_cities: Set[str] = set(CITY_SUBREDDITS.keys())  # Get set of all cities we care about
     
     # For each news article, figure out which cities it mentions using AI
-    for e in all_entries:                      # Loop through every piece of content
-        if e.source == "News":                 # Only analyze news articles (Reddit is already tagged by subreddit)
-            e.cities = detect_cities_in_text(e.text, e.title, nlp, known_cities)  # Use AI to detect cities
+    news_items = by_source["News"]             # Only news (Reddit is already tagged by subreddit)
+    synonym_hits = [match_city_synonyms(e.text, e.title) for e in news_items]  # Cheap step first
+    # Only articles where spaCy could still find another city go through the AI step
+    need_nlp = [i for i, (e, f) in enumerate(zip(news_items, synonym_hits)) if needs_city_nlp(f, e.text, e.title, known_cities)]
+    nlp_texts = (truncate_words(news_items[i].title + " " + news_items[i].text, 200) for i in need_nlp)  # First 200 words
+    # Batch the spaCy work with nlp.pipe; city detection only needs named entities, not the parser
+    docs = dict(zip(need_nlp, nlp.pipe(nlp_texts, batch_size=64, disable=["parser", "lemmatizer"])))
+    for i, e in enumerate(news_items):         # Loop through each news article
+        e.cities = detect_cities_in_text(e.text, e.title, nlp, known_cities,
+                                         doc=docs.get(i), found=synonym_hits[i])  # Use AI to detect cities
     
     # Create a mapping from cities to all content about that city
     city_to_entries: Dict[str, List[Entry]] = defaultdict(list)  # Dictionary that creates empty lists automatically
+    # Random samples for the OpenAI prompts are drawn in the same pass, so no separate sampling step is needed
+    # (per-city samples are seeded by the city name so reruns on the same data send the same prompt)
+    city_samples: Dict[str, Reservoir] = {}    # City -> sample of its content
+    title_sample = Reservoir(GLOBAL_SAMPLE_TITLES_FOR_TOPICS)  # Sample of all content, for topic context
     for e in all_entries:                      # Loop through all content
+        title_sample.add(e)
         if e.cities:                           # If this content mentions any cities
             for c in e.cities:                 # For each city mentioned in this content
                 city_to_entries[c].append(e)   # Add this content to that city's list
+                if c not in city_samples:
+                    city_samples[c] = Reservoir(CITY_DOCS_PER_MODEL_CALL, seed=c)
+                city_samples[c].add(e)
 
     # Step 6: Show a sample of the sources we collected (for transparency)
     print_header("All Collected Sources (sample)")  # Print header for sources section
@@ -1088,7 +2197,7 @@ def main():
         by_site[e.source_site].append(e)      # Group by the source website
     
     # Show the top 20 sources by volume (most content first)
-    for site, arr in sorted(by_site.items(), key=lambda x: -len(x[1]))[:20]:  # Sort by content count, take top 20
+    for site, arr in heapq.nlargest(20, by_site.items(), key=lambda x: len(x[1])):  # Top 20 by content count, no full sort
         print(f"\nSite: {site}  ({len(arr)} items)")  # Print source name and item count
         # Show first 5 items from each source as examples
         for x in arr[:5]:                      # Loop through first 5 items from this source
@@ -1102,7 +2211,7 @@ def main():
     keyword_counts_list = top_keyword_counts(all_entries, nlp, KEYWORD_PHRASE_LIMIT_FOR_TOPICS)  # Extract top keywords
     
     # Get a random sample of article titles to provide context to AI
-    sample_titles = [e.title for e in random.sample(all_entries, min(GLOBAL_SAMPLE_TITLES_FOR_TOPICS, len(all_entries)))]  # Random sample
+    sample_titles = [e.title for e in title_sample.items]  # Sampled while grouping by city
     
     # Ask OpenAI to identify the top civic topics from our data
     topics = openai_top_topics(keyword_counts_list, sample_titles)  # Use AI to analyze topics
@@ -1115,17 +2224,24 @@ def main():
         keywords = [p for p, _ in keyword_counts_list]  # Extract just the keywords (ignore counts)
         
         # Convert keywords to numerical vectors using spaCy's word embeddings
-        embeddings = np.array([nlp(k).vector for k in keywords])  # Convert each keyword to a number array
+        # Only the tokenizer is needed for a vector lookup, so every pipeline component is switched off
+        # and the keywords are streamed through in batches straight into one preallocated array
+        embeddings = np.zeros((len(keywords), nlp.vocab.vectors_length), dtype=np.float32)  # One row per keyword
+        for i, kdoc in enumerate(nlp.pipe(keywords, batch_size=256, disable=nlp.pipe_names)):
+            embeddings[i] = kdoc.vector        # Average of the keyword's word vectors
         
         # Filter out keywords that don't have good vector representations
-        valid_idx = [i for i, vec in enumerate(embeddings) if np.linalg.norm(vec) != 0]  # Find non-zero vectors
+        norms = np.linalg.norm(embeddings, axis=1)  # Length of every keyword vector in one call
+        valid_idx = np.nonzero(norms)[0]       # Find non-zero vectors
         
-        if valid_idx:                          # If we have valid keyword vectors
+        if valid_idx.size:                     # If we have valid keyword vectors
             emb = embeddings[valid_idx]        # Get only the valid embeddings
-            kw_valid = [keywords[i] for i in valid_idx]  # Get only the valid keywords
+            emb /= norms[valid_idx, None]      # Scale to unit length (cosine distance is unchanged)
+            kw_valid = [keywords[i] for i in valid_idx.tolist()]  # Get only the valid keywords
             
             # Use clustering algorithm to group similar keywords into 20 topics
-            clustering = AgglomerativeClustering(n_clusters=20, linkage="average", metric="cosine")  # Create clustering algorithm
+            # k-means on unit vectors groups by cosine similarity without building an N x N distance matrix
+            clustering = MiniBatchKMeans(n_clusters=min(20, len(kw_valid)), batch_size=1024, n_init=3, random_state=0)  # Create clustering algorithm
             labels = clustering.fit_predict(emb)  # Run clustering on our keyword vectors
             
             # Group keywords by their cluster assignments
@@ -1144,42 +2260,56 @@ def main():
     city_scores: Dict[str, Dict[str, Any]] = {}  # Dictionary to store scores for each city
     
     # Go through each city, starting with those that have the most content
-    for city, items in sorted(city_to_entries.items(), key=lambda x: -len(x[1])):  # Sort cities by content volume
+    cities_by_volume = sorted(city_to_entries.items(), key=lambda x: -len(x[1]))  # Sort cities by content volume
+    city_snippets: List[Tuple[str, List[str]]] = []  # (city, snippets) to send to OpenAI
+    # An entry that mentions several cities is formatted (and its text truncated) only once
+    snippet_cache: Dict[int, str] = {}         # id(entry) -> formatted snippet
+    for city, items in cities_by_volume:       # Loop through each city
         
         # Prepare text snippets for AI analysis
         snippets: List[str] = []               # List to store formatted text snippets
         
         # Sample some items (not all, to save on OpenAI API costs)
-        sample_items = random.sample(items, min(CITY_DOCS_PER_MODEL_CALL, len(items)))  # Random sample of content
+        sample_items = city_samples[city].items  # Sampled while grouping by city
         
         # Create a formatted snippet for each piece of content
         for e in sample_items:                 # Loop through sampled content
-            # Format: "Title: ... Text: ... Source: ..."
-            snip = f"Title: {truncate_words(e.title, 20)}\nText: {truncate_words(e.text, 60)}\nSource: {e.source} [{e.source_site}] {e.url}"
+            snip = snippet_cache.get(id(e))
+            if snip is None:
+                # Format: "Title: ... Text: ... Source: ..."
+                snip = f"Title: {truncate_words(e.title, 20)}\nText: {truncate_words(e.text, 60)}\nSource: {e.source} [{e.source_site}] {e.url}"
+                snippet_cache[id(e)] = snip
             snippets.append(snip)              # Add formatted snippet to our list
-        
-        # Ask OpenAI to score this city's civic health
-        score = openai_score_city(city, snippets)  # Use AI to analyze and score this city
+        city_snippets.append((city, snippets))
+    
+    # Ask OpenAI to score every city's civic health (requests run concurrently)
+    scores = score_all_cities(city_snippets)   # One result per city, same order
+    
+    out: List[str] = []                        # Output lines, written 10 cities at a time
+    for n, ((city, items), score) in enumerate(zip(cities_by_volume, scores), 1):  # Print results in the original order
         city_scores[city] = score              # Store the results for this city
         
         # Display the results for this city
-        print_city_score(city, score)          # Print formatted city analysis
+        out.extend(format_city_score(city, score))  # Formatted city analysis
         
         # Show all the sources we used for this city's analysis (for transparency)
-        print("  Citations:")                  # Print citations header
+        out.append("  Citations:")             # Citations header
         urls = unique_preserve_order([e.url for e in items])  # Get unique URLs, preserving order
-        for u in urls[:40]:                    # Show up to 40 URLs (to avoid overwhelming output)
-            print(f"    - {u}")                # Print each URL with indentation
+        out.extend(f"    - {u}" for u in urls[:40])  # Show up to 40 URLs (to avoid overwhelming output)
         if len(urls) > 40:                     # If there are more than 40 URLs
-            print(f"    (+ {len(urls) - 40} more)")  # Show how many additional sources we have
+            out.append(f"    (+ {len(urls) - 40} more)")  # Show how many additional sources we have
+        if n % 10 == 0:                        # Write out a batch of cities
+            emit_lines(out)
+            out = []
+    emit_lines(out)                            # Whatever is left from the last batch
 
     # Step 9: Print final summary statistics
     print_header("Basic Stats")                # Print header for final statistics section
     
     # Count different types of content we collected
-    news_count = len([e for e in all_entries if e.source == "News"])          # Count news articles
-    reddit_posts = len([e for e in all_entries if e.source == "RedditPost"])  # Count Reddit posts
-    reddit_comments = len([e for e in all_entries if e.source == "RedditComment"])  # Count Reddit comments
+    news_count = len(by_source["News"])        # Count news articles
+    reddit_posts = len(by_source["RedditPost"])  # Count Reddit posts
+    reddit_comments = len(by_source["RedditComment"])  # Count Reddit comments
     
     # Display the final summary statistics
     print(f"News Articles: {news_count}")      # Print total number of news articles
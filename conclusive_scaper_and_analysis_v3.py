@@ -7,24 +7,30 @@
 
 # Import all the libraries we need for this program
 import os                           # For reading environment variables (like API keys)
+import re                           # For compiled pattern matching (city synonyms)
 import time                         # For adding delays between web requests (to be polite)
 import json                         # For working with JSON data from APIs
 import random                       # For randomly sampling data when we have too much
 import requests                     # For making HTTP requests to websites
-from bs4 import BeautifulSoup      # For parsing HTML content from websites
-import spacy                        # For natural language processing (understanding text)
+from bs4 import BeautifulSoup, SoupStrainer  # For parsing HTML content from websites
 import numpy as np                  # For mathematical operations on arrays
-from collections import Counter, defaultdict  # For counting things and organizing data
+from collections import Counter, defaultdict, deque  # For counting things and organizing data
 from dataclasses import dataclass  # For creating simple data structures
-from typing import List, Dict, Any, Optional, Tuple, Set  # For type hints (helps with code clarity)
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable  # For type hints (helps with code clarity)
+from functools import lru_cache     # For building the OpenAI client only once
 from contextlib import contextmanager  # For creating context managers
 import signal                       # For handling system signals
 from urllib.parse import urljoin, urlparse  # For working with URLs
 from datetime import datetime, timezone     # For handling dates and times
-from concurrent.futures import ThreadPoolExecutor, as_completed  # For safe parallel requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed  # For safe parallel requests and parsing
 import sqlite3                     # For caching visited URLs across runs (resume)
 import threading                  # For thread-safe SQLite access
+import atexit                     # For writing out buffered cache rows when the run ends
+import multiprocessing            # For starting parse workers without forking the threaded scraper
+import zlib                       # For compressing cached page bodies
 import xml.etree.ElementTree as ET # For lightweight XML parsing (RSS/Sitemaps)
+import asyncio                    # For overlapping many downloads at once
+import socket                     # For warming up DNS before the crawl
 
 try:
     # Optional dependency for robust RSS parsing; we will gracefully fallback if missing
@@ -32,13 +38,97 @@ try:
 except Exception:                  # If not installed, we'll use a simple XML fallback
     feedparser = None
 
+try:
+    # Optional libxml2 bindings (lxml): C tree builder for BeautifulSoup, compiled XPath for feeds/sitemaps
+    import lxml.etree as lxml_etree
+    BS4_PARSER = "lxml"
+except Exception:                  # If not installed, BeautifulSoup's pure-Python parser and ElementTree are used
+    lxml_etree = None
+    BS4_PARSER = "html.parser"
+
+try:
+    # Optional fast HTML parser (selectolax, C) for article pages; Lexbor backend on selectolax >= 1.0
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except Exception:
+    try:
+        from selectolax.parser import HTMLParser  # Older releases only ship the Modest backend
+    except Exception:              # If not installed, every page goes through BeautifulSoup
+        HTMLParser = None
+
 try:
     # Retry utilities for robust HTTP sessions
     from urllib3.util.retry import Retry
 except Exception:
     Retry = None
 
-from sklearn.cluster import AgglomerativeClustering  # For grouping similar keywords together
+try:
+    # Optional Brotli decoder: lets requests/urllib3 decode "br" responses (usually smaller than gzip)
+    import brotli                  # noqa: F401
+except Exception:                  # If not installed, we stop offering br to servers
+    brotli = None
+
+try:
+    # The encodings the installed urllib3 can decode: gzip/deflate, plus br and zstd when their decoders are present
+    from urllib3.util.request import ACCEPT_ENCODING as _URLLIB3_ENCODINGS
+except Exception:
+    _URLLIB3_ENCODINGS = None
+
+try:
+    # Optional async HTTP client: lets hundreds of article/comment downloads wait on the network together
+    import aiohttp
+except Exception:                  # If not installed, downloads run on a thread pool instead
+    aiohttp = None
+
+try:
+    # Optional fast JSON parser (orjson, written in Rust) for Reddit's large JSON listings
+    import orjson
+except Exception:                  # If not installed, the standard library json module is used
+    orjson = None
+
+# Parse a JSON string: orjson when available (several times faster), otherwise json.loads
+json_loads = orjson.loads if orjson is not None else json.loads
+
+def write_json_file(obj: Any, path: str, pretty: bool = False) -> None:
+    """
+    Write obj to path as UTF-8 JSON: orjson when available (much faster on big documents), otherwise json.dump
+    """
+    if orjson is not None:
+        try:
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0)
+            data = orjson.dumps(obj, option=option)
+        except TypeError:                  # A type orjson can't encode: let json.dump handle it below
+            data = None
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+            return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2 if pretty else None)
+
+try:
+    # Optional fast 64-bit hash (xxhash) for compact title fingerprints
+    import xxhash
+except Exception:                  # If not installed, Python's built-in hash() is used
+    xxhash = None
+
+try:
+    # Optional multi-pattern matcher (pyahocorasick) for fast city-synonym detection
+    import ahocorasick             # C implementation of the Aho-Corasick automaton
+except Exception:                  # If not installed, we check each synonym separately
+    ahocorasick = None
+
+try:
+    # Optional C ISO-8601 parser (ciso8601) for article dates
+    import ciso8601
+except Exception:                  # If not installed, datetime.fromisoformat is used
+    ciso8601 = None
+
+try:
+    # Optional JIT compiler (numba) for the smart-selection pick loop
+    import numba
+except Exception:                  # If not installed, the loop runs as plain Python
+    numba = None
+
 import argparse                   # For command-line flags to control scale and inputs
 
 # Import dynamic discovery helpers to scale to 100 cities
@@ -49,8 +139,27 @@ from cities_and_sources import (
     build_global_sources,         # Build global pool (>= 100 unique sources)
 )
 
+# One pooled session for every Nominatim request, so all boundary lookups share a kept-alive TLS connection
+_NOMINATIM_SESSION: Optional[requests.Session] = None
+
+def nominatim_session() -> requests.Session:
+    """
+    Return the shared Nominatim session (created on first use) with a small pool and retries on 429/5xx
+    """
+    global _NOMINATIM_SESSION
+    if _NOMINATIM_SESSION is None:
+        sess = build_http_session()
+        if Retry is not None:
+            retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        sess.mount('https://', adapter)
+        _NOMINATIM_SESSION = sess
+    return _NOMINATIM_SESSION
+
 def fetch_city_boundary_geojson(city: str, country: Optional[str] = None, session: Optional[requests.Session] = None, delay_sec: float = 1.0) -> Optional[Dict[str, Any]]:
-    s = session or build_http_session()
+    s = session or nominatim_session()
     q = city if not country else f"{city}, {country}"
     url = "https://nominatim.openstreetmap.org/search"
     params = {"format": "json", "polygon_geojson": 1, "q": q}
@@ -71,27 +180,86 @@ def fetch_city_boundary_geojson(city: str, country: Optional[str] = None, sessio
         return None
     return None
 
-def build_city_boundaries_geojson(cities: List[Tuple[str, Optional[str]]], out_path: str) -> int:
-    features: List[Dict[str, Any]] = []
-    s = build_http_session()
-    for city, country in cities:
-        gj = fetch_city_boundary_geojson(city, country, session=s)
-        if not gj:
-            continue
-        feat = {
-            "type": "Feature",
-            "properties": {"name": city, "country": country or ""},
-            "geometry": gj,
-        }
-        features.append(feat)
-    fc = {"type": "FeatureCollection", "features": features}
+def build_city_boundaries_geojson(cities: List[Tuple[str, Optional[str]]], out_path: str, workers: int = 4, min_interval_sec: float = 1.0) -> int:
+    s = nominatim_session()
+    dumps = orjson.dumps if orjson is not None else (lambda o: json.dumps(o).encode("utf-8"))
+    written = 0
+    # (city, country, future) in request order; each finished boundary is written out and dropped right away,
+    # so only the boundaries still in flight are held in memory
+    pending: deque = deque()
+    # Stream into a temp file and swap it in only once complete, so a failure or Ctrl-C part way
+    # through never replaces the last good file with a truncated one
+    tmp_path = out_path + ".tmp"
+    done = False
     try:
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(fc, f)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with open(tmp_path, "wb") as f, ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            f.write(b'{"type":"FeatureCollection","features":[')
+
+            def flush(block: bool) -> None:
+                nonlocal written
+                while pending and (block or pending[0][2].done()):
+                    city, country, fut = pending.popleft()
+                    gj = fut.result()
+                    if not gj:
+                        continue
+                    feat = {
+                        "type": "Feature",
+                        "properties": {"name": city, "country": country or ""},
+                        "geometry": gj,
+                    }
+                    f.write((b"," if written else b"") + dumps(feat))
+                    written += 1
+
+            # Nominatim allows about 1 request/second: start one lookup per interval, but let slow responses
+            # overlap with the wait instead of doing round trip + sleep one city at a time
+            for i, (city, country) in enumerate(cities):
+                if i:
+                    time.sleep(min_interval_sec)
+                pending.append((city, country, ex.submit(fetch_city_boundary_geojson, city, country, s, 0.0)))
+                flush(block=False)
+            flush(block=True)
+            f.write(b"]}")
+        os.replace(tmp_path, out_path)
+        done = True
     except Exception:
-        pass
-    return len(features)
+        written = 0                            # Nothing was saved; the previous file (if any) is untouched
+    finally:
+        if not done:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return written
+
+def dedupe_sources(urls) -> Tuple[str, ...]:
+    """
+    Drop repeated news sites, keeping the first listing of each
+    
+    Two URLs count as the same site when host (ignoring "www." and case), and path (ignoring a
+    trailing "/") match; different sections of one outlet (e.g. a city edition path) are kept
+    
+    Args:
+        urls: Site URLs, possibly with repeats
+    
+    Returns:
+        The sites in their original order, each once
+    """
+    by_key: Dict[Tuple[str, str], str] = {}
+    for u in urls:
+        parts = urlparse(u)
+        host = (parts.hostname or u).lower()
+        key = (host[4:] if host.startswith("www.") else host, parts.path.rstrip("/"))
+        by_key.setdefault(key, u)
+    return tuple(by_key.values())
+
+def report_dropped_sources(listed, kept) -> None:
+    """
+    Print which source URLs dedupe_sources dropped (nothing if none were)
+    """
+    dropped = list((Counter(listed) - Counter(kept)).elements())
+    if dropped:
+        print(f"Dropped {len(dropped)} duplicate news sources: {', '.join(dropped)}")
 
 # =========================
 # CONFIGURATION SECTION
@@ -100,7 +268,7 @@ def build_city_boundaries_geojson(cities: List[Tuple[str, Optional[str]]], out_p
 # List of international news websites we want to scrape
 # Each website will be visited to collect recent articles
 NEWS_SOURCES = [
-    # Major US and Global news sources
+    # Major US and Global news sources (repeats are dropped just below the list)
     "https://www.nytimes.com",          # New York Times
     "https://www.cnn.com",              # CNN
     "https://www.bbc.com",              # BBC (British)
@@ -226,6 +394,11 @@ NEWS_SOURCES = [
     "https://www.nzherald.co.nz",            # NZ Herald (NZ)
 ]
 
+# Several regional sites are listed twice above; crawl each site once (immutable tuple from here on).
+# Silent here (this module is re-imported by the parse pool); main() reports what was dropped
+_LISTED_NEWS_SOURCES = NEWS_SOURCES
+NEWS_SOURCES = dedupe_sources(_LISTED_NEWS_SOURCES)
+
 # Dictionary mapping city names to their Reddit community names
 # Key = Official city name, Value = Reddit subreddit name
 CITY_SUBREDDITS = {
@@ -317,6 +490,28 @@ CITY_SYNONYMS = {
     "amsterdam": "Amsterdam",               # Dutch capital
 }
 
+# All synonyms in one Aho-Corasick automaton: a single pass over the text finds every one of them
+_CITY_AC = None                             # Stays None when pyahocorasick is missing
+if ahocorasick is not None:
+    _CITY_AC = ahocorasick.Automaton()
+    for _k, _canonical in CITY_SYNONYMS.items():  # Store the synonym too, to locate where each hit starts
+        _CITY_AC.add_word(_k, (_k, _canonical))
+    _CITY_AC.make_automaton()
+
+# Fallback when pyahocorasick is missing: one compiled alternation of all synonyms
+# Longest synonyms first so "new york city" wins over "new york"; the lookarounds require whole words
+# (so "la" does not match inside "plan"), and unlike \b they also work for synonyms ending in "." like "l.a."
+CITY_PATTERN = re.compile(
+    r"(?<!\w)(" + "|".join(sorted(map(re.escape, CITY_SYNONYMS), key=len, reverse=True)) + r")(?!\w)",
+    re.IGNORECASE,
+)
+
+def _is_word_char(c: str) -> bool:
+    """
+    True for letters, digits and underscore (characters that continue a word)
+    """
+    return c.isalnum() or c == "_"
+
 # The 12 dimensions we use to measure civic health
 # These represent different aspects of city life quality
 CIVIC_DIMENSIONS = [
@@ -356,16 +551,34 @@ DEFAULT_HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",    # Prefer English content
     "Connection": "keep-alive",              # Keep connection open for efficiency
     "Referer": "https://www.google.com/",    # Pretend we came from Google
-    "Accept-Encoding": "gzip, deflate, br",  # Enable compression
+    # Enable compression; only offer br/zstd when we can decode them, otherwise such a reply would be unreadable
+    "Accept-Encoding": (", ".join(_URLLIB3_ENCODINGS.split(",")) if _URLLIB3_ENCODINGS
+                        else "gzip, deflate, br" if brotli is not None else "gzip, deflate"),
 }
 
+# Resumable crawl: every fetch_all download of this run is checkpointed, so a crashed or
+# interrupted run restarted with --resume (or the same CRAWL_RUN_ID) reuses what it already
+# downloaded; a run that gets through its crawl deletes its checkpoint
+CRAWL_PROGRESS_DB_PATH = os.path.join("data", "crawl_progress.sqlite")
+CRAWL_RUN_ID = os.getenv("CRAWL_RUN_ID") or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+CRAWL_CHECKPOINT_MAX_AGE_DAYS = 7  # Unfinished runs left longer than this are deleted when the checkpoint is opened
+
+# Conditional-GET cache: pages saved with their ETag/Last-Modified so a rerun can ask
+# "changed since?" and get a tiny 304 instead of the whole page again
+HTTP_CACHE_DB_PATH = os.path.join("data", "http_cache.sqlite")
+HTTP_CACHE_MAX_AGE_DAYS = 30       # Saved pages older than this are deleted when the cache is opened
+HTTP_CACHE_FLUSH_EVERY = 64        # Saved pages buffered before one batched write
+
 # =========================
 # DATA STRUCTURES
 # =========================
 
 # Define a data structure to hold information about each article/post/comment
+# Slotted, including the per-entry values memoized below (word count, relevance, domain id, recency)
 @dataclass
 class Entry:
+    __slots__ = ("source", "source_site", "url", "title", "date", "text", "cities", "_word_count", "_relevance", "_dom_id", "_recency")
+    
     source: str                 # Type of content: 'News', 'RedditPost', or 'RedditComment'
     source_site: str            # Which website it came from (e.g., 'www.nytimes.com' or 'r/nyc')
     url: str                    # The web address of the article/post
@@ -373,11 +586,127 @@ class Entry:
     date: Optional[str]         # When it was published (if available, None if unknown)
     text: str                   # The main content text
     cities: List[str]           # Which cities this content is about (detected by AI)
+    
+    def __post_init__(self):
+        # Per-entry values computed on first use, then reused for every city the entry is scored for
+        self._word_count: Optional[int] = None
+        self._relevance: Optional[float] = None
+        self._dom_id: int = entry_dom_id(self.source, self.source_site)  # Interned once; indexes _DOM_REP
+        self._recency: Optional[float] = None
+    
+    @property
+    def word_count(self) -> int:
+        """
+        Number of words in text (split once, then remembered)
+        """
+        if self._word_count is None:
+            self._word_count = len((self.text or "").split())
+        return self._word_count
+    
+    @property
+    def civic_relevance(self) -> float:
+        """
+        _civic_relevance_score of this entry (computed once, then remembered)
+        """
+        if self._relevance is None:
+            self._relevance = _civic_relevance_score(self.text or "", self.title or "")
+        return self._relevance
+    
+    @property
+    def recency(self) -> float:
+        """
+        _recency_score of this entry's date (parsed once, then remembered)
+        """
+        if self._recency is None:
+            self._recency = _recency_score(self.date)
+        return self._recency
 
 # =========================
 # UTILITY FUNCTIONS
 # =========================
 
+_HTTP_CACHE_CONN: Optional[sqlite3.Connection] = None
+_HTTP_CACHE_LOCK = threading.Lock()
+_HTTP_CACHE_PENDING: Dict[str, Tuple[str, Optional[str], Optional[str], bytes, int]] = {}  # url -> row not yet written
+
+def _http_cache_conn() -> Optional[sqlite3.Connection]:
+    """
+    Open (once) the conditional-GET cache database; None if it can't be created
+    """
+    global _HTTP_CACHE_CONN
+    if _HTTP_CACHE_CONN is None:
+        try:
+            os.makedirs(os.path.dirname(HTTP_CACHE_DB_PATH) or ".", exist_ok=True)
+            conn = sqlite3.connect(HTTP_CACHE_DB_PATH, check_same_thread=False, timeout=30)
+            # Same settings as the visited-URL cache: readers don't wait on writers, no fsync per commit
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS url_cache (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB, fetched_at INTEGER)")
+            conn.execute("DELETE FROM url_cache WHERE fetched_at < ?", (int(time.time()) - HTTP_CACHE_MAX_AGE_DAYS * 86400,))
+            conn.commit()
+            _HTTP_CACHE_CONN = conn
+        except Exception:                      # Caching is best-effort
+            return None
+    return _HTTP_CACHE_CONN
+
+def http_cache_get(url: str) -> Optional[Tuple[Optional[str], Optional[str], bytes]]:
+    """
+    Return (etag, last_modified, compressed body) saved for url, or None
+    """
+    with _HTTP_CACHE_LOCK:
+        row = _HTTP_CACHE_PENDING.get(url)     # Saved this run but not written yet
+        if row is not None:
+            return row[1:4]
+        conn = _http_cache_conn()
+        if conn is None:
+            return None
+        return conn.execute("SELECT etag, last_modified, body FROM url_cache WHERE url=?", (url,)).fetchone()
+
+def http_cache_put(url: str, etag: Optional[str], last_modified: Optional[str], text: str) -> None:
+    """
+    Save a page with its validators (only worth it when the server sent an ETag or Last-Modified)
+    """
+    if not (etag or last_modified):
+        return
+    body = zlib.compress(text.encode("utf-8"), 6)
+    with _HTTP_CACHE_LOCK:
+        _HTTP_CACHE_PENDING[url] = (url, etag, last_modified, body, int(time.time()))
+        full = len(_HTTP_CACHE_PENDING) >= HTTP_CACHE_FLUSH_EVERY
+    if full:
+        http_cache_flush()
+
+def http_cache_flush() -> None:
+    """
+    Write the buffered pages in one transaction (also runs at exit, so the tail of a run is kept)
+    """
+    try:
+        with _HTTP_CACHE_LOCK:
+            if not _HTTP_CACHE_PENDING:
+                return
+            rows = list(_HTTP_CACHE_PENDING.values())
+            _HTTP_CACHE_PENDING.clear()
+            conn = _http_cache_conn()
+            if conn is None:
+                return
+            with conn:                         # Commits on success, rolls back on error
+                conn.executemany("INSERT OR REPLACE INTO url_cache (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)", rows)
+    except Exception:
+        pass
+
+atexit.register(http_cache_flush)
+
+def conditional_headers(cached: Optional[Tuple[Optional[str], Optional[str], bytes]]) -> Dict[str, str]:
+    """
+    If-None-Match / If-Modified-Since headers for a cached page (empty if nothing cached)
+    """
+    out: Dict[str, str] = {}
+    if cached:
+        if cached[0]:
+            out["If-None-Match"] = cached[0]
+        if cached[1]:
+            out["If-Modified-Since"] = cached[1]
+    return out
+
 def safe_request(url: str, headers: Optional[dict] = None, timeout: int = 20, max_retries: int = 2) -> Optional[str]:
     """
     Safely download a web page with error handling and retries
@@ -392,14 +721,22 @@ def safe_request(url: str, headers: Optional[dict] = None, timeout: int = 20, ma
         The HTML content of the page, or None if it failed
     """
     hdrs = headers or DEFAULT_HEADERS  # Use provided headers or our default browser headers
+    cached = http_cache_get(url)               # Saved copy from an earlier run (if the server gave validators)
+    if cached:
+        hdrs = {**hdrs, **conditional_headers(cached)}  # Ask the server whether it changed
     
     # Try multiple times in case of temporary network issues
     for attempt in range(max_retries):         # Loop through retry attempts
         try:
-            # Make the HTTP request to download the webpage
-            r = requests.get(url, headers=hdrs, timeout=timeout)  # Send GET request with headers and timeout
+            DOMAIN_LIMITER.wait(get_domain(url))  # Respect this site's request rate
+            # Make the HTTP request to download the webpage (pooled keep-alive connection)
+            r = _SESSION.get(url, headers=hdrs, timeout=timeout)  # Send GET request with headers and timeout
+            # Not modified since last run: reuse the saved body
+            if r.status_code == 304 and cached:
+                return zlib.decompress(cached[2]).decode("utf-8")
             # Check if the request was successful (status code 200 means "OK")
             if r.status_code == 200:           # If server responded with success
+                http_cache_put(url, r.headers.get("ETag"), r.headers.get("Last-Modified"), r.text)
                 return r.text                  # Return the HTML content as text
             # Backoff on rate-limit
             if r.status_code == 429:
@@ -419,6 +756,9 @@ def safe_request(url: str, headers: Optional[dict] = None, timeout: int = 20, ma
     # If all attempts failed, return None
     return None                                # Indicate that the download completely failed
 
+HTTP_POOL_HOSTS = 256              # Hosts whose kept-alive connections the session holds on to at once
+HTTP_POOL_PER_HOST = 64            # Kept-alive connections per host
+
 def build_http_session() -> requests.Session:
     """
     Create a shared HTTP session with connection pooling, compression, and retries.
@@ -428,13 +768,289 @@ def build_http_session() -> requests.Session:
     # Retry policy: 1 retry with exponential backoff for idempotent methods
     if Retry is not None:
         retry = Retry(total=1, backoff_factor=0.6, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
-        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST, max_retries=retry)
     else:
-        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST)
     sess.mount('http://', adapter)
     sess.mount('https://', adapter)
     return sess
 
+# One session for the whole run: safe_request and the scrapers reuse its kept-alive
+# connections instead of paying a TCP + TLS handshake on every request
+_SESSION = build_http_session()
+
+# Concurrency limits for fetch_all (aiohttp path)
+FETCH_CONCURRENCY = 64              # Downloads in flight at once, across all sites
+FETCH_PER_HOST = 4                  # Downloads in flight at once for any single site (politeness)
+PARSE_WORKERS = os.cpu_count() or 4 # Processes that parse pages while downloads are still running
+
+# Requests per second allowed per site (matched on the end of the host name), so concurrency
+# never hammers one server into banning us; anything not listed gets DOMAIN_RATE_DEFAULT
+DOMAIN_RATE_LIMITS: Dict[str, float] = {
+    "reddit.com": 1.0,
+    "nytimes.com": 4.0,
+}
+DOMAIN_RATE_DEFAULT = 2.0
+DOMAIN_RATE_BURST = 4               # Requests a site may get back to back after a quiet spell
+
+class DomainLimiter:
+    """
+    Per-site token bucket: spaces requests to each host out to its rate, for threads (wait)
+    or coroutines (await_turn); one instance is shared by every thread and event loop
+    """
+    def __init__(self, default_rate: float, rates: Optional[Dict[str, float]] = None, burst: int = 1):
+        self.default_rate = default_rate
+        self.rates = rates or {}
+        self.burst = max(1, burst)
+        self.next_time: Dict[str, float] = {}  # Host -> theoretical time its bucket is empty again
+        self.lock = threading.Lock()           # Only one caller reserves a time slot at a time
+
+    def _rate_for(self, host: str) -> float:
+        for suffix, rate in self.rates.items():
+            if host == suffix or host.endswith("." + suffix):
+                return rate
+        return self.default_rate
+
+    def _reserve(self, host: str) -> float:
+        """
+        Reserve this host's next free slot and return how long to wait for it (seconds)
+        """
+        host = host.lower()
+        interval = 1.0 / self._rate_for(host)
+        with self.lock:
+            now = time.monotonic()
+            tat = max(now, self.next_time.get(host, now))
+            self.next_time[host] = tat + interval
+        # The bucket holds `burst` requests, so only wait once it's more than that far behind
+        return max(0.0, tat - (self.burst - 1) * interval - now)
+
+    def wait(self, host: str) -> None:
+        """
+        Block until this thread may send a request to host
+        """
+        delay = self._reserve(host)
+        if delay > 0:
+            time.sleep(delay)                  # Sleep outside the lock so other threads can reserve slots
+
+    async def await_turn(self, host: str) -> None:
+        """
+        Pause this coroutine (without blocking the others) until it may send a request to host
+        """
+        delay = self._reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)         # Other downloads keep running while we wait
+
+DOMAIN_LIMITER = DomainLimiter(DOMAIN_RATE_DEFAULT, DOMAIN_RATE_LIMITS, DOMAIN_RATE_BURST)
+
+async def afetch(session: "aiohttp.ClientSession", url: str, sem: "asyncio.Semaphore",
+                 headers: Optional[dict] = None, timeout: int = 20, max_retries: int = 2) -> Optional[str]:
+    """
+    Async version of safe_request: download one page, retrying on 429/5xx/network errors
+    
+    Args:
+        session: The shared aiohttp session (its connector caps connections per host)
+        url: The web address to download
+        sem: Semaphore capping how many downloads run at once
+        headers: Extra/override HTTP headers for this request
+        timeout: How long to wait before giving up (in seconds)
+        max_retries: How many times to try if it fails
+    
+    Returns:
+        The page text, or None if it failed
+    """
+    cached = http_cache_get(url)               # Saved copy from an earlier run (if any)
+    if cached:
+        headers = {**(headers or {}), **conditional_headers(cached)}
+    host = get_domain(url)
+    for attempt in range(max_retries):
+        try:
+            await DOMAIN_LIMITER.await_turn(host)  # Wait for this site's next slot before taking a download slot
+            async with sem:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+                    if r.status == 304 and cached:  # Unchanged: reuse the saved body
+                        return zlib.decompress(cached[2]).decode("utf-8")
+                    if r.status == 200:
+                        text = await r.text(errors="replace")
+                        http_cache_put(url, r.headers.get("ETag"), r.headers.get("Last-Modified"), text)
+                        return text
+                    status = r.status
+            if status == 429:                  # Rate-limited: back off like safe_request
+                await asyncio.sleep(min(8.0, 0.5 * (2 ** attempt)) + random.uniform(0.0, 0.5))
+                continue
+            if not 500 <= status < 600:        # 403/404/...: retrying won't help
+                return None
+        except Exception:                      # Network error, timeout, etc.
+            pass
+        await asyncio.sleep(0.6 * (attempt + 1))
+    return None
+
+async def _fetch_all_async(urls: List[str], headers: Optional[dict], timeout: int, max_retries: int,
+                           on_page: Optional[Callable[[str, Optional[str]], None]] = None) -> List[Optional[str]]:
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=FETCH_CONCURRENCY, limit_per_host=FETCH_PER_HOST,
+                                     use_dns_cache=True, ttl_dns_cache=600)
+    # aiohttp negotiates Accept-Encoding itself (only offering br when it can decode it)
+    base_headers = {k: v for k, v in DEFAULT_HEADERS.items() if k != "Accept-Encoding"}
+    async with aiohttp.ClientSession(headers=base_headers, connector=connector) as session:
+        async def one(u: str) -> Optional[str]:
+            page = await afetch(session, u, sem, headers, timeout, max_retries)
+            if on_page is not None:
+                on_page(u, page)               # Must not block: it runs on the event loop
+            return page
+        return await asyncio.gather(*[one(u) for u in urls])
+
+def fetch_all(urls: List[str], headers: Optional[dict] = None, timeout: int = 20, max_retries: int = 2) -> List[Optional[str]]:
+    """
+    Download many pages at once (aiohttp when installed, otherwise a thread pool over safe_request)
+    
+    Pages already downloaded earlier in this run (see CRAWL_RUN_ID / --resume) come from the checkpoint
+    instead of the network; new downloads are added to it
+    
+    Args:
+        urls: The web addresses to download
+        headers: Extra/override HTTP headers sent with every request
+        timeout: Per-request timeout in seconds
+        max_retries: Tries per URL
+    
+    Returns:
+        One result per URL, in the same order: page text, or None if that download failed
+    """
+    if not urls:
+        return []
+    done = CRAWL_CHECKPOINT.get_many(urls)     # Finished before a crash/restart
+    todo = [u for u in urls if u not in done]
+    if todo:
+        try:
+            pages = _download_all(todo, headers, timeout, max_retries, on_page=CRAWL_CHECKPOINT.record)
+        finally:
+            CRAWL_CHECKPOINT.flush()
+        done.update((u, page) for u, page in zip(todo, pages) if page is not None)
+    return [done.get(u) for u in urls]
+
+def _download_all(urls: List[str], headers: Optional[dict], timeout: int, max_retries: int,
+                  on_page: Optional[Callable[[str, Optional[str]], None]] = None) -> List[Optional[str]]:
+    results: Dict[str, Optional[str]] = {}     # URL -> page for every download already handed to on_page
+    callback_errors: List[Exception] = []      # on_page failures are the caller's, never a reason to fall back
+    
+    def finished(u: str, page: Optional[str]) -> None:
+        results[u] = page
+        if on_page is not None:
+            try:
+                on_page(u, page)
+            except Exception as exc:
+                callback_errors.append(exc)
+                raise
+    
+    if aiohttp is not None:
+        try:
+            # Each calling thread gets its own event loop (scrape_all_news runs sites on threads)
+            return asyncio.run(_fetch_all_async(urls, headers, timeout, max_retries, finished))
+        except (RuntimeError, OSError, aiohttp.ClientError):  # Event loop/session trouble: threads for the rest
+            if callback_errors:
+                raise
+    hdrs = {**DEFAULT_HEADERS, **headers} if headers else None
+    
+    def one(u: str) -> None:
+        finished(u, safe_request(u, headers=hdrs, timeout=timeout, max_retries=max_retries))
+    
+    todo = [u for u in urls if u not in results]  # Only what the async pass didn't finish
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        list(ex.map(one, todo))
+    return [results.get(u) for u in urls]
+
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_POOL_LOCK = threading.Lock()
+
+def _parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    The shared page-parsing process pool (created on first use); None if processes can't be started
+    """
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is None:
+            try:
+                # Workers are started on first submit, from a scraper thread while other threads hold
+                # event-loop/SQLite/SSL locks; forkserver children start from a clean single-threaded
+                # process instead of inheriting those locks through fork()
+                _PARSE_POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                                  mp_context=multiprocessing.get_context("forkserver"))
+            except Exception:
+                return None
+        return _PARSE_POOL
+
+def shutdown_parse_pool() -> None:
+    """
+    Stop the parse workers (if they were ever started)
+    """
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is not None:
+            _PARSE_POOL.shutdown(wait=True, cancel_futures=True)
+            _PARSE_POOL = None
+
+def fetch_and_parse_all(urls: List[str], parse: Callable[[str], Any], headers: Optional[dict] = None,
+                        timeout: int = 20, max_retries: int = 2) -> List[Any]:
+    """
+    fetch_all, with each page handed to parse in a worker process as soon as it arrives, so
+    parsing (CPU) overlaps the downloads still in flight (network) and isn't held by the GIL
+    
+    Args:
+        urls: The web addresses to download
+        parse: Function applied to each page text (must be a top-level function so it can be pickled)
+        headers: Extra/override HTTP headers sent with every request
+        timeout: Per-request timeout in seconds
+        max_retries: Tries per URL
+    
+    Returns:
+        One result per URL, in the same order: parse(page), or None if the download or parse failed
+    """
+    if not urls:
+        return []
+    pool = _parse_pool()
+    if pool is None:                           # No worker processes: download everything, then parse here
+        out = []
+        for page in fetch_all(urls, headers, timeout, max_retries):
+            try:
+                out.append(parse(page) if page else None)
+            except Exception:
+                out.append(None)
+        return out
+    
+    futs: Dict[str, Any] = {}                  # URL -> Future of parse(page), or the page itself if the pool refused it
+    
+    def submit(u: str, page: Optional[str]) -> None:
+        if page:
+            try:
+                futs[u] = pool.submit(parse, page)
+            except Exception:                  # Broken pool: parse it in this thread at the end
+                futs[u] = page
+    
+    done = CRAWL_CHECKPOINT.get_many(urls)     # Finished before a crash/restart
+    for u, page in done.items():               # These parse while the rest download
+        submit(u, page)
+    todo = [u for u in urls if u not in done]
+    def on_page(u: str, page: Optional[str]) -> None:
+        CRAWL_CHECKPOINT.record(u, page)       # Checkpoint as it arrives, not after the whole batch
+        submit(u, page)
+    
+    if todo:
+        try:
+            _download_all(todo, headers, timeout, max_retries, on_page=on_page)
+        finally:
+            CRAWL_CHECKPOINT.flush()
+    
+    out = []
+    for u in urls:
+        f = futs.get(u)
+        try:
+            if isinstance(f, str):
+                out.append(parse(f))
+            else:
+                out.append(f.result() if f is not None else None)
+        except Exception:                      # Parse error (or a worker died)
+            out.append(None)
+    return out
+
 def truncate_words(s: str, max_words: int) -> str:
     """
     Cut off text after a certain number of words to keep things manageable
@@ -474,6 +1090,7 @@ def unique_preserve_order(seq: List[str]) -> List[str]:
 # SMART SELECTION HELPERS
 # -------------------------
 
+@lru_cache(maxsize=4096)                     # Only a few hundred distinct sites, each scored many times
 def _norm_domain(host: str) -> str:
     host = (host or "").lower().strip()
     if host.startswith("r/"):
@@ -493,6 +1110,53 @@ DOMAIN_REPUTATION: Dict[str, float] = {
     "cnn.com": 0.88, "latimes.com": 0.87, "smh.com.au": 0.86, "lemonde.fr": 0.90,
 }
 
+# Every domain key seen gets a small int id; its reputation sits at that index, so a list of
+# entries turns into one array gather instead of a string normalize + dict lookup each
+_DOM_ID: Dict[str, int] = {}
+_DOM_REP: List[float] = []
+_DOM_LOCK = threading.Lock()                # Entries are built from several scraper threads
+_DOM_REP_ARR = np.empty(0)                  # numpy copy of _DOM_REP, rebuilt when new ids appear
+
+def dom_id(key: str, rep: float = 0.60) -> int:
+    """
+    Intern a domain key (normalized news domain, or the Reddit source type) to an int id
+
+    Args:
+        key: The domain key
+        rep: Reputation to store if the key is new (unknown news sites get 0.60)
+
+    Returns:
+        The key's id
+    """
+    i = _DOM_ID.get(key)
+    if i is None:
+        with _DOM_LOCK:
+            i = _DOM_ID.get(key)
+            if i is None:
+                i = len(_DOM_REP)
+                _DOM_REP.append(rep)
+                _DOM_ID[key] = i
+    return i
+
+for _d, _r in DOMAIN_REPUTATION.items():
+    dom_id(_d, _r)
+dom_id("RedditPost", 0.58)
+dom_id("RedditComment", 0.52)
+
+def entry_dom_id(source: str, source_site: str) -> int:
+    """
+    Domain id of an entry: news is grouped by site, Reddit by post/comment type
+    """
+    if source == "News":
+        return dom_id(_norm_domain(source_site))
+    return dom_id(source, 0.58 if source == "RedditPost" else 0.52)
+
+def _dom_rep_array() -> np.ndarray:
+    global _DOM_REP_ARR
+    if len(_DOM_REP_ARR) != len(_DOM_REP):
+        _DOM_REP_ARR = np.array(_DOM_REP, dtype=np.float64)
+    return _DOM_REP_ARR
+
 # Simple keyword sets per civic dimension for relevance scoring
 DIMENSION_SYNONYMS: Dict[str, List[str]] = {
     "affordability": ["affordable", "cost of living", "rent", "rents", "price", "prices", "inflation", "wage", "income", "poverty"],
@@ -509,21 +1173,49 @@ DIMENSION_SYNONYMS: Dict[str, List[str]] = {
     "health": ["health", "healthcare", "hospital", "clinic", "disease", "vaccination", "mental health", "public health", "mortality"],
 }
 
+# Each distinct civic term -> how many dimensions list it ("hospital" counts for services and health)
+_CIVIC_TERM_WEIGHTS: Dict[str, int] = Counter(t for terms in DIMENSION_SYNONYMS.values() for t in terms)
+
+# All civic terms in one automaton: a single pass over the text finds every term it contains
+_CIVIC_AC = None                            # Stays None when pyahocorasick is missing
+if ahocorasick is not None:
+    _CIVIC_AC = ahocorasick.Automaton()
+    for _t in _CIVIC_TERM_WEIGHTS:
+        _CIVIC_AC.add_word(_t, _t)
+    _CIVIC_AC.make_automaton()
+
 def _civic_relevance_score(text: str, title: str) -> float:
     blob = (title + " " + text).lower()
     hits = 0
-    for terms in DIMENSION_SYNONYMS.values():
-        for t in terms:
+    if _CIVIC_AC is not None:
+        found: Set[str] = set()                 # A term counts once however often it appears
+        for _, t in _CIVIC_AC.iter(blob):
+            if t not in found:
+                found.add(t)
+                hits += _CIVIC_TERM_WEIGHTS[t]
+                if hits >= 8:                   # Score is capped at 8 hits
+                    break
+    else:
+        for t, weight in _CIVIC_TERM_WEIGHTS.items():
             if t in blob:
-                hits += 1
+                hits += weight
+                if hits >= 8:
+                    break
     return min(hits / 8.0, 1.0)
 
+_NOW = datetime.now(timezone.utc)           # "Today" for recency: fixed once per run
+_NOW_NAIVE = _NOW.replace(tzinfo=None)      # Same instant, for dates without a timezone
+_ISO_DATE_RE = re.compile(r"\d{4}-?\d{2}-?\d{2}")  # Anything else can't be ISO, so skip the parse attempt
+
 def _days_ago_from_iso(s: Optional[str]) -> Optional[int]:
-    if not s:
+    if not s or not _ISO_DATE_RE.match(s):
         return None
     try:
-        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
-        delta = datetime.now(timezone.utc) - dt if dt.tzinfo else datetime.utcnow() - dt
+        if ciso8601 is not None:
+            dt = ciso8601.parse_datetime(s)
+        else:
+            dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+        delta = _NOW - dt if dt.tzinfo else _NOW_NAIVE - dt
         return max(0, int(delta.total_seconds() // 86400))
     except Exception:
         return None
@@ -540,75 +1232,116 @@ def _recency_score(iso_date: Optional[str]) -> float:
     return 0.35
 
 def score_entry_for_city(e: Entry, city: str, nlp) -> float:
-    if e.source == "News":
-        q = DOMAIN_REPUTATION.get(_norm_domain(e.source_site), 0.60)
-    elif e.source == "RedditPost":
-        q = 0.58
-    else:
-        q = 0.52
+    q = _DOM_REP[e._dom_id]
 
-    length_score = min(len((e.text or "").split()) / 600.0, 1.0)
-    rel_score = _civic_relevance_score(e.text or "", e.title or "")
-    time_score = _recency_score(e.date)
+    length_score = min(e.word_count / 600.0, 1.0)
+    rel_score = e.civic_relevance
+    time_score = e.recency
     return (0.30 * q) + (0.45 * rel_score) + (0.15 * length_score) + (0.10 * time_score)
 
-def smart_select_for_city(city: str, entries: List[Entry], target_n: int, nlp) -> List[Entry]:
-    if target_n <= 0 or not entries:
-        return []
-    if len(entries) <= target_n:
-        return entries[:]
-
-    scored: List[Tuple[float, str, Entry]] = []
-    for e in entries:
-        try:
-            s = score_entry_for_city(e, city, nlp)
-        except Exception:
-            s = 0.0
-        if e.source == "News":
-            dkey = _norm_domain(e.source_site)
-        else:
-            dkey = e.source
-        scored.append((s, dkey, e))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-
-    domains = {d for _, d, _ in scored}
-    approx_domains = max(1, len(domains))
-    max_per_domain = max(3, target_n // max(8, approx_domains))
-
-    picked: List[Entry] = []
-    used_titles: Set[str] = set()
-    per_domain: Dict[str, int] = defaultdict(int)
+def score_entries_for_city(entries: List[Entry], city: str, nlp) -> np.ndarray:
+    """
+    score_entry_for_city for a whole list at once: the four sub-scores are gathered into
+    arrays and combined in one vectorized expression
+    """
+    n = len(entries)
+    dom_ids = np.fromiter((e._dom_id for e in entries), dtype=np.intp, count=n)
+    q = _dom_rep_array()[dom_ids]
+    words = np.fromiter((e.word_count for e in entries), dtype=np.float64, count=n)
+    rel = np.fromiter((e.civic_relevance for e in entries), dtype=np.float64, count=n)
+    recency = np.fromiter((e.recency for e in entries), dtype=np.float64, count=n)
+    length = np.minimum(words / 600.0, 1.0)
+    return 0.30 * q + 0.45 * rel + 0.15 * length + 0.10 * recency
+
+def _pick_indices(order, dom_ids, title_ids, target_n, max_per_domain, per_domain, used_title, is_picked, out) -> int:
+    """
+    The ordered pick loop of smart_select_for_city, on plain integer columns
 
-    def _title_key(e: Entry) -> str:
-        t = (e.title or "").lower()
-        return " ".join([w for w in t.replace("-", " ").split()[:12]])
+    Args:
+        order: Entry indexes, best score first
+        dom_ids: Domain id of each entry
+        title_ids: Title id of each entry (same id = duplicate title)
+        target_n: How many entries to pick
+        max_per_domain: Per-domain cap for the first pass
+        per_domain, used_title, is_picked: Zeroed work buffers (per domain id, title id, entry)
+        out: Buffer of length target_n that receives the picked indexes
 
-    for _, d, e in scored:
-        if len(picked) >= target_n:
+    Returns:
+        How many indexes were written to out
+    """
+    n_out = 0
+    # The title check depends on what was picked before (in score order), so this stays one ordered pass
+    for i in order:
+        if n_out >= target_n:
             break
+        d = dom_ids[i]
         if per_domain[d] >= max_per_domain:
-                continue
-        tk = _title_key(e)
-        if tk in used_titles:
             continue
-        picked.append(e)
-        used_titles.add(tk)
+        t = title_ids[i]
+        if used_title[t]:
+            continue
+        out[n_out] = i
+        n_out += 1
+        is_picked[i] = True
+        used_title[t] = True
         per_domain[d] += 1
 
-    if len(picked) < target_n:
-        for _, d, e in scored:
-            if len(picked) >= target_n:
+    # Back-fill without the domain cap
+    if n_out < target_n:
+        for i in order:
+            if n_out >= target_n:
                 break
-            tk = _title_key(e)
-            if tk in used_titles:
-                continue
-            if e in picked:
+            t = title_ids[i]
+            if used_title[t] or is_picked[i]:
                 continue
-            picked.append(e)
-            used_titles.add(tk)
+            out[n_out] = i
+            n_out += 1
+            is_picked[i] = True
+            used_title[t] = True
+    return n_out
+
+if numba is not None:
+    _pick_indices = numba.njit(cache=True)(_pick_indices)
+
+def smart_select_for_city(city: str, entries: List[Entry], target_n: int, nlp) -> List[Entry]:
+    if target_n <= 0 or not entries:
+        return []
+    if len(entries) <= target_n:
+        return entries[:]
+
+    try:
+        scores = score_entries_for_city(entries, city, nlp)
+    except Exception:
+        scores = np.zeros(len(entries))
+    # Scores lie in [0,1] and only their order matters: as int16 the stable sort is a radix sort
+    keys = np.rint(np.clip(scores, 0.0, 1.0) * 32767).astype(np.int16)
+    order = np.argsort(-keys, kind="stable")  # Best first; ties keep their original order
+
+    # Entries carry an interned domain id, so the per-domain cap is an array index
+    dom_ids = [e._dom_id for e in entries]
+    approx_domains = max(1, len(set(dom_ids)))
+    max_per_domain = max(3, target_n // max(8, approx_domains))
 
-    return picked[:target_n]
+    # Titles that agree on their first 12 words share an id (via a 64-bit fingerprint)
+    title_id_of: Dict[int, int] = {}
+    title_ids: List[int] = []
+    for e in entries:
+        t = " ".join((e.title or "").lower().replace("-", " ").split()[:12])
+        k = xxhash.xxh64_intdigest(t) if xxhash is not None else hash(t)
+        title_ids.append(title_id_of.setdefault(k, len(title_id_of)))
+
+    n = len(entries)
+    if numba is not None:                      # Compiled loop wants numpy arrays
+        out = np.empty(target_n, dtype=np.int64)
+        n_picked = _pick_indices(order, np.array(dom_ids, dtype=np.int64), np.array(title_ids, dtype=np.int64),
+                                 target_n, max_per_domain,
+                                 np.zeros(len(_DOM_REP), dtype=np.int64), np.zeros(len(title_id_of), dtype=np.bool_),
+                                 np.zeros(n, dtype=np.bool_), out)
+    else:                                      # Plain Python indexes lists faster than numpy arrays
+        out = [0] * target_n
+        n_picked = _pick_indices(order.tolist(), dom_ids, title_ids, target_n, max_per_domain,
+                                 [0] * len(_DOM_REP), [False] * len(title_id_of), [False] * n, out)
+    return [entries[i] for i in out[:n_picked]]
 
 @contextmanager
 def time_limit(seconds: int):
@@ -628,6 +1361,17 @@ def get_domain(url: str) -> str:
     Returns:
         Just the domain part like "www.nytimes.com"
     """
+    # Fast path for absolute URLs: the domain sits between "://" and the next "/", "?" or "#"
+    # (same result as urlparse(url).netloc, without building a whole parse result)
+    i = url.find("://")
+    if i > 0:
+        start = i + 3
+        end = len(url)
+        for sep in "/?#":
+            j = url.find(sep, start)
+            if j != -1 and j < end:
+                end = j
+        return url[start:end]
     try:
         # Use urlparse to break down the URL and get just the domain part
         return urlparse(url).netloc            # Extract the network location (domain) from URL
@@ -643,9 +1387,18 @@ def get_domain(url: str) -> str:
 # -------------------------
 
 CACHE_LOCK = threading.Lock()
+VISITED_TABLES = ("visited", "visited_reddit_posts")  # News articles; Reddit posts whose comments were collected
+_VISITED_BY_DB: Dict[Tuple[str, str], Set[str]] = {}  # (database path, table) -> its URLs, loaded once
+_CONN_VISITED: Dict[Tuple[sqlite3.Connection, str], Set[str]] = {}  # (connection, table) -> the set for its database
 
 def _init_cache(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)  # Wait out another site's write lock
+    # WAL: cache_has reads don't block on (or block) other sites' inserts; NORMAL: no fsync per commit
+    # (a crash can lose the last few visited marks, which only means refetching those pages)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
     conn.execute("CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY, first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
     conn.execute("CREATE TABLE IF NOT EXISTS visited_reddit_posts (url TEXT PRIMARY KEY, first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
     # Cumulative distinct counters table
@@ -653,21 +1406,233 @@ def _init_cache(db_path: str) -> sqlite3.Connection:
     for k in ("articles_distinct", "reddit_posts_distinct", "reddit_comments_total"):
         conn.execute("INSERT OR IGNORE INTO metrics(k,v) VALUES(?,0)", (k,))
     conn.commit()
+    # Every site opens its own connection, but each table is read into memory only the first time
+    with CACHE_LOCK:
+        for table in VISITED_TABLES:
+            key = (os.path.abspath(db_path), table)
+            if key not in _VISITED_BY_DB:
+                _VISITED_BY_DB[key] = {row[0] for row in conn.execute(f"SELECT url FROM {table}")}
+            _CONN_VISITED[(conn, table)] = _VISITED_BY_DB[key]
     return conn
 
-def cache_has(conn: sqlite3.Connection, url: str) -> bool:
+CACHE_FLUSH_EVERY = 64             # Visited URLs buffered per connection before one batched insert
+_PENDING_VISITED: Dict[Tuple[sqlite3.Connection, str], List[str]] = defaultdict(list)  # Not yet written, per connection/table
+
+def cache_has(conn: sqlite3.Connection, url: str, table: str = "visited") -> bool:
+    return url in _CONN_VISITED[(conn, table)]  # Set lookup: no query, no lock
+
+def cache_put(conn: sqlite3.Connection, url: str, table: str = "visited") -> None:
     with CACHE_LOCK:
-        cur = conn.execute("SELECT 1 FROM visited WHERE url=?", (url,))
-        return cur.fetchone() is not None
+        _CONN_VISITED[(conn, table)].add(url)  # Visible to cache_has right away; the row is written on flush
+        pending = _PENDING_VISITED[(conn, table)]
+        pending.append(url)
+        full = len(pending) >= CACHE_FLUSH_EVERY
+    if full:
+        _flush_cache(conn)
+
+def cache_has_reddit(conn: sqlite3.Connection, url: str) -> bool:
+    return cache_has(conn, url, "visited_reddit_posts")
+
+def cache_put_reddit(conn: sqlite3.Connection, url: str) -> None:
+    cache_put(conn, url, "visited_reddit_posts")
 
-def cache_put(conn: sqlite3.Connection, url: str) -> None:
+def _flush_cache(conn: sqlite3.Connection) -> None:
+    """
+    Write this connection's buffered visited URLs in one transaction (one lock, one commit)
+    """
     try:
         with CACHE_LOCK:
-            conn.execute("INSERT OR IGNORE INTO visited(url) VALUES(?)", (url,))
-            conn.commit()
+            batches = [(table, _PENDING_VISITED.pop((conn, table), None)) for table in VISITED_TABLES]
+            if any(batch for _, batch in batches):
+                with conn:                     # Commits on success, rolls back on error
+                    for table, batch in batches:
+                        if batch:
+                            conn.executemany(f"INSERT OR IGNORE INTO {table}(url) VALUES(?)", [(u,) for u in batch])
     except Exception:
         pass
 
+class CrawlCheckpoint:
+    """
+    SQLite record of what this run has downloaded: crawl_progress(run_id, url, status, ts, body)
+    
+    Successful downloads keep their (compressed) body so a resumed run can reuse it; failures are
+    recorded with status 0 and retried. A run deletes its rows once its crawl is done (finish()),
+    and runs abandoned for CRAWL_CHECKPOINT_MAX_AGE_DAYS are deleted on open
+    """
+    BATCH = 100                                # Rows written per transaction (avoids one fsync per page)
+    LOOKUP_BATCH = 500                         # URLs per IN (...) lookup (SQLite caps bound parameters)
+
+    def __init__(self, db_path: str, run_id: str):
+        self.db_path = db_path
+        self.run_id = run_id
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+        self.pending: List[Tuple[str, Optional[str]]] = []  # Results from record() not yet written
+        self.pending_lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.conn is None:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute("CREATE TABLE IF NOT EXISTS crawl_progress (run_id TEXT, url TEXT, status INTEGER, ts REAL, body BLOB, PRIMARY KEY (run_id, url))")
+                cutoff = time.time() - CRAWL_CHECKPOINT_MAX_AGE_DAYS * 86400
+                conn.execute("DELETE FROM crawl_progress WHERE run_id IN "
+                             "(SELECT run_id FROM crawl_progress GROUP BY run_id HAVING MAX(ts) < ?)", (cutoff,))
+                conn.commit()
+                self.conn = conn
+            except Exception:                  # Checkpointing is best-effort
+                return None
+        return self.conn
+
+    def _select_done(self, conn: sqlite3.Connection, urls: List[str], columns: str) -> List[tuple]:
+        """
+        Rows (url first, then `columns`) of the given URLs downloaded successfully in this run,
+        LOOKUP_BATCH URLs per query
+        """
+        uniq = list(set(urls))
+        rows: List[tuple] = []
+        for i in range(0, len(uniq), self.LOOKUP_BATCH):
+            chunk = uniq[i:i + self.LOOKUP_BATCH]
+            marks = ",".join("?" * len(chunk))
+            rows.extend(conn.execute(f"SELECT url{columns} FROM crawl_progress WHERE run_id=? AND status=200 AND url IN ({marks})",
+                                     [self.run_id, *chunk]).fetchall())
+        return rows
+
+    def resume_latest(self) -> Optional[str]:
+        """
+        Switch to the most recent unfinished run so its downloads are reused; returns its id
+        (None when there is nothing to resume)
+        """
+        try:
+            with self.lock:
+                conn = self._connect()
+                if conn is None:
+                    return None
+                row = conn.execute("SELECT run_id FROM crawl_progress GROUP BY run_id ORDER BY MAX(ts) DESC LIMIT 1").fetchone()
+        except Exception:
+            return None
+        if row is not None:
+            self.run_id = row[0]
+        return row[0] if row is not None else None
+
+    def finish(self) -> None:
+        """
+        The crawl is complete: drop this run's rows so the next run fetches fresh content
+        """
+        with self.pending_lock:
+            self.pending = []                  # Nothing left to resume, so no need to write these
+        try:
+            with self.lock:
+                conn = self._connect()
+                if conn is None:
+                    return
+                with conn:
+                    conn.execute("DELETE FROM crawl_progress WHERE run_id=?", (self.run_id,))
+        except Exception:
+            pass
+
+    def get_many(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Bodies of the given URLs already downloaded successfully in this run
+        """
+        out: Dict[str, str] = {}
+        try:
+            with self.lock:
+                conn = self._connect()
+                if conn is None:
+                    return out
+                for u, body in self._select_done(conn, urls, ", body"):
+                    out[u] = zlib.decompress(body).decode("utf-8")
+        except Exception:
+            pass
+        return out
+
+    def done_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Which of the given URLs were already downloaded successfully in this run
+        """
+        out: Set[str] = set()
+        try:
+            with self.lock:
+                conn = self._connect()
+                if conn is None:
+                    return out
+                out.update(u for u, in self._select_done(conn, urls, ""))
+        except Exception:
+            pass
+        return out
+
+    def record(self, url: str, page: Optional[str]) -> None:
+        """
+        Note one download result as it arrives; written BATCH at a time, so a crash mid-site
+        loses at most the last partial batch
+        """
+        with self.pending_lock:
+            self.pending.append((url, page))
+            if len(self.pending) < self.BATCH:
+                return
+            batch, self.pending = self.pending, []
+        self.record_many(batch)
+
+    def flush(self) -> None:
+        """
+        Write whatever record() still holds
+        """
+        with self.pending_lock:
+            batch, self.pending = self.pending, []
+        if batch:
+            self.record_many(batch)
+
+    def record_many(self, results: List[Tuple[str, Optional[str]]]) -> None:
+        """
+        Save download results (url, page text or None), BATCH rows per transaction
+        """
+        now = time.time()
+        rows = [(self.run_id, u, 200 if page is not None else 0, now,
+                 zlib.compress(page.encode("utf-8"), 6) if page is not None else None) for u, page in results]
+        try:
+            with self.lock:
+                conn = self._connect()
+                if conn is None:
+                    return
+                for i in range(0, len(rows), self.BATCH):
+                    with conn:                 # One transaction per batch
+                        conn.executemany("INSERT OR REPLACE INTO crawl_progress (run_id, url, status, ts, body) VALUES (?, ?, ?, ?, ?)",
+                                         rows[i:i + self.BATCH])
+        except Exception:
+            pass
+
+CRAWL_CHECKPOINT = CrawlCheckpoint(CRAWL_PROGRESS_DB_PATH, CRAWL_RUN_ID)
+
+# Words that indicate a link is probably not a news article
+# We want to avoid login pages, ads, newsletters, etc.
+LINK_DISALLOW = (
+    "login", "subscribe", "privacy", "terms", "contact", "about", "account",     # Account-related pages
+    "profile", "help", "signup", "register", "cookie", "advert", "ads",         # User/admin pages
+    "newsletter", "newsletters", "video", "videos", "watch", "live", "sport",   # Media/entertainment
+    "sports", "weather", "sso", "comment-policy"                                # Other non-article pages
+)
+# All of them as one case-insensitive alternation (substring match, like `k in path.lower()`)
+_DISALLOW_RE = re.compile("|".join(map(re.escape, LINK_DISALLOW)), re.IGNORECASE)
+# Path shape checks as regexes (no per-link segment list): at least two non-empty "/" segments, and
+# some segment of 4+ characters that contains a hyphen or is all letters
+_TWO_SEGMENTS_RE = re.compile(r"[^/]/+[^/]")
+_ARTICLE_SEG_RE = re.compile(r"(?:^|/)(?:(?=[^/]*-)[^/]{4,}|[^\W\d_]{4,})(?=/|$)")
+
+def _homepage_hrefs(html: str) -> List[str]:
+    """
+    Every <a href> value on a page, in document order (selectolax when installed, else BeautifulSoup)
+    """
+    if HTMLParser is not None:
+        try:
+            return [a.attributes.get("href") or "" for a in HTMLParser(html).css("a[href]")]
+        except Exception:                      # Page selectolax can't handle: use BeautifulSoup
+            pass
+    # Parse only the <a href> tags: that's all we look at
+    soup = BeautifulSoup(html, BS4_PARSER, parse_only=SoupStrainer("a", href=True))
+    return [a.get("href") for a in soup.find_all("a", href=True)]
+
 def extract_links_from_homepage(base_url: str, html: str, limit: int) -> List[str]:
     """
     Find article links on a news website's homepage
@@ -680,27 +1645,21 @@ def extract_links_from_homepage(base_url: str, html: str, limit: int) -> List[st
     Returns:
         List of article URLs found on the homepage
     """
-    soup = BeautifulSoup(html, "html.parser")  # Parse the HTML content into a searchable structure
     links: List[str] = []                      # Initialize empty list to store the links we find
+    seen: Set[str] = set()                     # Every absolute URL already checked (kept or rejected)
     base_domain = get_domain(base_url)         # Get the domain of the main site (e.g., "www.nytimes.com")
     
-    # Words that indicate a link is probably not a news article
-    # We want to avoid login pages, ads, newsletters, etc.
-    disallow = (
-        "login", "subscribe", "privacy", "terms", "contact", "about", "account",     # Account-related pages
-        "profile", "help", "signup", "register", "cookie", "advert", "ads",         # User/admin pages
-        "newsletter", "newsletters", "video", "videos", "watch", "live", "sport",   # Media/entertainment
-        "sports", "weather", "sso", "comment-policy"                                # Other non-article pages
-    )
-    
     # Look through all the links on the page
-    for a in soup.find_all("a", href=True):   # Find all <a> tags that have an href attribute
-        href = a.get("href").strip()           # Get the link URL and remove any whitespace
+    for href in _homepage_hrefs(html):         # The href of every <a> tag that has one
+        href = href.strip()                    # Remove any whitespace around the link URL
         if not href or href.startswith("#"):  # Skip empty links or page anchors (internal links)
             continue                           # Move to the next link
         
         # Convert relative URLs to absolute URLs (e.g., "/article" becomes "https://site.com/article")
         full = urljoin(base_url, href)         # Combine base URL with the link to make it complete
+        if full in seen:                       # Menus repeat the same links many times: judge each URL once
+            continue
+        seen.add(full)
         d = get_domain(full)                   # Get the domain of this link
         
         # Only keep links that are on the same website (avoid external links)
@@ -712,24 +1671,20 @@ def extract_links_from_homepage(base_url: str, html: str, limit: int) -> List[st
         path = parsed.path or "/"              # Get the path part of the URL (everything after domain)
         
         # Skip links that contain words from our disallow list
-        if any(k in path.lower() for k in disallow):  # Check if any forbidden words are in the path
+        if _DISALLOW_RE.search(path):          # One regex pass instead of one substring scan per word
             continue                           # Skip this link if it matches forbidden patterns
         
-        # Break the path into segments (parts separated by "/")
-        segments = [seg for seg in path.split("/") if seg]  # Split path by "/" and remove empty segments
-        
         # Skip if the path is too short (probably not an article)
-        if len(segments) < 2:                  # If path has fewer than 2 segments
+        if not _TWO_SEGMENTS_RE.search(path):  # If path has fewer than 2 non-empty segments
             continue                           # Skip it (probably just the homepage)
         
         # Check if the path looks like it could be an article
         # Articles usually have segments with letters, hyphens, and reasonable length
-        if not any(("-" in seg or seg.isalpha()) and len(seg) >= 4 for seg in segments):
+        if not _ARTICLE_SEG_RE.search(path):
             continue                           # Skip if path doesn't look like an article URL
         
         # If this link passes all our tests, add it to our collection
-        if full not in links:                  # If we haven't already collected this link
-            links.append(full)                 # Add it to our list of article URLs
+        links.append(full)                     # Add it to our list of article URLs (new, per the check above)
         
         # Stop when we have enough links (collect extra since some might not be real articles)
         if len(links) >= limit * 6:           # Collect 6x the limit to account for filtering (increased for more coverage)
@@ -737,6 +1692,33 @@ def extract_links_from_homepage(base_url: str, html: str, limit: int) -> List[st
     
     return links                               # Return the list of article URLs we found
 
+_XPATHS = threading.local()        # Compiled XPaths, one set per thread (lxml's aren't meant to be shared)
+
+def _xml_texts(xml: str, kind: str) -> Optional[List[str]]:
+    """
+    Texts matched by a precompiled lxml XPath: kind "rss" -> every <item>'s <link>, kind "loc" ->
+    every <loc> in any namespace (sitemaps)
+
+    Returns:
+        The texts in document order, or None if lxml is missing or the XML won't parse
+        (the caller then falls back to ElementTree)
+    """
+    if lxml_etree is None:
+        return None
+    xps = getattr(_XPATHS, "xps", None)
+    if xps is None:
+        xps = _XPATHS.xps = {
+            "rss": lxml_etree.XPath("//item/link[1]/text()", smart_strings=False),
+            "loc": lxml_etree.XPath("//*[local-name()='loc']/text()", smart_strings=False),
+        }
+    try:
+        # Bytes so a <?xml encoding=...?> declaration is allowed; never fetch DTDs or expand entities
+        parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True)
+        root = lxml_etree.fromstring(xml.encode("utf-8"), parser)
+    except Exception:
+        return None
+    return xps[kind](root)
+
 def parse_rss_for_links(feed_xml: str, limit: int) -> List[str]:
     links: List[str] = []
     if feedparser is not None:
@@ -750,6 +1732,9 @@ def parse_rss_for_links(feed_xml: str, limit: int) -> List[str]:
         except Exception:
             pass
     # Fallback simple XML
+    found = _xml_texts(feed_xml, "rss")
+    if found is not None:
+        return [u for u in found if u][:limit]
     try:
         root = ET.fromstring(feed_xml)
         for item in root.findall('.//item'):
@@ -775,47 +1760,89 @@ def discover_article_links(base_url: str, session: requests.Session, limit: int)
                 seen.add(u)
                 candidates.append(u)
 
-    # Try common RSS endpoints and accumulate
-    rss_paths = ["/rss", "/feed", "/rss.xml", "/feeds/all.rss", "/feeds/rss.xml"]
-    for p in rss_paths:
+    def probe(url: str, ok_only: bool = True) -> str:
         try:
-            resp = session.get(urljoin(base_url, p), timeout=8)
-            if resp.status_code == 200 and resp.text:
-                links = parse_rss_for_links(resp.text, limit)
+            DOMAIN_LIMITER.wait(get_domain(url))  # All probes hit one host: stay within its rate and burst
+            resp = session.get(url, timeout=8)
+            return resp.text if resp.status_code == 200 or not ok_only else ""
+        except Exception:
+            return ""
+
+    # Fire every probe (RSS endpoints, sitemap, homepage) at once: a dead host costs one timeout,
+    # not one per probe. Results are still used in the order below, so candidates stay deterministic
+    rss_paths = ["/rss", "/feed", "/rss.xml", "/feeds/all.rss", "/feeds/rss.xml"]
+    with ThreadPoolExecutor(max_workers=len(rss_paths) + 2) as ex:
+        rss_futs = [ex.submit(probe, urljoin(base_url, p)) for p in rss_paths]
+        sitemap_fut = ex.submit(probe, urljoin(base_url, "/sitemap.xml"))
+        home_fut = ex.submit(probe, base_url, False) if base_url else None
+
+        # Try common RSS endpoints and accumulate
+        for fut in rss_futs:
+            text = fut.result()
+            if text:
+                links = parse_rss_for_links(text, limit)
                 add_links(links)
                 if len(candidates) >= limit * 2:
                     break
-        except Exception:
-            continue
 
-    # Try sitemap and accumulate
-    try:
-        resp = session.get(urljoin(base_url, "/sitemap.xml"), timeout=8)
-        if resp.status_code == 200 and resp.text:
+        # Try sitemap and accumulate
+        text = sitemap_fut.result()
+        if text:
             try:
-                root = ET.fromstring(resp.text)
-                for loc in root.findall('.//{*}loc'):
-                    url = loc.text or ""
+                locs = _xml_texts(text, "loc")
+                if locs is None:
+                    locs = [loc.text for loc in ET.fromstring(text).findall('.//{*}loc')]
+                for url in locs:
+                    url = url or ""
                     if url and any(seg in url for seg in ("/news/", "/article", "/stories", "/world/", "/business/")):
                         add_links([url])
                         if len(candidates) >= limit * 2:
                             break
             except Exception:
                 pass
-    except Exception:
-        pass
 
-    # Fallback/top-up via homepage parsing
-    try:
-        homepage_html = session.get(base_url, timeout=8).text if base_url else ""
-    except Exception:
-        homepage_html = ""
+        # Fallback/top-up via homepage parsing
+        homepage_html = home_fut.result() if home_fut is not None else ""
     if homepage_html:
         more = extract_links_from_homepage(base_url, homepage_html, limit)
         add_links(more)
 
     return candidates[: max(limit * 2, len(candidates))]
 
+# Containers that usually hold the article body, most specific last (first match wins)
+ARTICLE_ROOT_SELECTORS = ('article', 'main', '[role="main"]', 'div[itemprop="articleBody"]', 'section.article', 'div#main-content')
+
+def _extract_title_and_text_fast(html: str) -> Tuple[str, str]:
+    """
+    extract_title_and_text on selectolax: same rules, without building a Python object per tag
+    """
+    tree = HTMLParser(html)
+    for node in tree.css("script, style, nav, footer, header, aside"):  # Drop the same unwanted tags
+        node.decompose()
+    
+    title = ''
+    og = tree.css_first('meta[property="og:title"]')
+    if og is not None and (og.attributes.get('content') or '').strip():
+        title = og.attributes['content'].strip()
+    if not title:
+        t = tree.css_first('title')
+        if t is not None:
+            title = t.text().strip()
+    if not title:
+        h1 = tree.css_first('h1')
+        if h1 is not None:
+            title = h1.text(strip=True)
+    
+    container = next((r for r in (tree.css_first(sel) for sel in ARTICLE_ROOT_SELECTORS) if r is not None), None)
+    texts: List[str] = []
+    for p in (container or tree).css('p'):
+        words = p.text(separator=" ").split()  # Also drops the empty separators between whitespace-only nodes
+        if len(words) >= 3:                    # Same 3-word minimum as the BeautifulSoup path
+            texts.append(" ".join(words))
+        if len(texts) >= 200:
+            break
+    return title, "\n".join(texts)
+
 def extract_title_and_text(html: str) -> Tuple[str, str]:
     """
     Extract the title and main text content from an article's HTML
@@ -826,7 +1853,13 @@ def extract_title_and_text(html: str) -> Tuple[str, str]:
     Returns:
         A tuple containing (title, main_text)
     """
-    soup = BeautifulSoup(html, 'html.parser')  # Parse the HTML content into a searchable structure
+    if HTMLParser is not None:                 # selectolax when installed; BeautifulSoup for anything it chokes on
+        try:
+            return _extract_title_and_text_fast(html)
+        except Exception:
+            pass
+    
+    soup = BeautifulSoup(html, BS4_PARSER)     # Parse the HTML content into a searchable structure
     
     # Remove elements we don't want (scripts, navigation, ads, etc.)
     for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):  # Find unwanted tags
@@ -897,7 +1930,7 @@ def scrape_news_site(base_url: str, label: str, limit: int) -> List[Entry]:
     print(f"[news] Using requests extractor for {label}")  # Show progress message to user
     entries: List[Entry] = []                  # Initialize empty list to store articles we find
 
-    session = build_http_session()             # Connection pooling session
+    session = _SESSION                         # Shared connection pool
     cache = _init_cache(os.path.join("data", "visited.sqlite"))  # SQLite cache
     
     # Step 1: Prefer RSS/sitemap, fallback to homepage
@@ -908,14 +1941,11 @@ def scrape_news_site(base_url: str, label: str, limit: int) -> List[Entry]:
     # Step 2: Download and process each article (parallel)
     count = 0                                  # Initialize counter for successfully processed articles
     total_candidates = len(candidates)         # Get total number of candidate URLs for progress tracking
-    def fetch_one(u: str) -> Optional[Entry]:
+    def parse_one(u: str, parsed: Optional[Tuple[str, str]]) -> Optional[Entry]:
         try:
-            if cache_has(cache, u):
+            if not parsed:
                 return None
-            resp = session.get(u, timeout=8)
-            if resp.status_code != 200 or not resp.text:
-                return None
-            title, text = extract_title_and_text(resp.text)
+            title, text = parsed
             if not (title or text) or (len(text.split()) < 5 and len(title) < 2):
                 return None
             cache_put(cache, u)
@@ -931,17 +1961,25 @@ def scrape_news_site(base_url: str, label: str, limit: int) -> List[Entry]:
         except Exception:
             return None
 
-    with ThreadPoolExecutor(max_workers=24) as ex:  # Concurrency (cap per site)
-        futures = [ex.submit(fetch_one, u) for u in candidates[: limit * 3]]
-        for i, fut in enumerate(as_completed(futures), 1):
+    # Download every new candidate at once; pages are parsed in worker processes as they arrive,
+    # then kept in candidate order
+    # (articles this same run already downloaded before a restart are in `visited` too, but still
+    # belong in this run's results; the crawl checkpoint serves them)
+    resumed = CRAWL_CHECKPOINT.done_urls(candidates[: limit * 3])
+    to_fetch = [u for u in candidates[: limit * 3] if u in resumed or not cache_has(cache, u)]
+    parsed_pages = fetch_and_parse_all(to_fetch, extract_title_and_text, timeout=8, max_retries=1)
+    try:
+        for i, (u, parsed) in enumerate(zip(to_fetch, parsed_pages), 1):
             if count >= limit:
                 break
             if i % 50 == 0:
                 print(f"    Progress: {i}/{total_candidates} URLs processed, {count} articles collected")
-            res = fut.result()
+            res = parse_one(u, parsed)
             if res is not None:
                 entries.append(res)
                 count += 1
+    finally:
+        _flush_cache(cache)                    # Write whatever cache_put buffered for this site
     
     return entries                             # Return all the articles we successfully collected
 
@@ -964,6 +2002,31 @@ def print_progress_bar(current: int, total: int, prefix: str = "", length: int =
     bar = '█' * filled_length + '-' * (length - filled_length)  # Create the visual bar
     print(f'\r{prefix} |{bar}| {percent:.1f}% ({current}/{total})', end='', flush=True)  # Print progress bar
 
+def prefetch_dns(urls: List[str]) -> int:
+    """
+    Resolve every site's hostname up front, in parallel, so the OS resolver cache is warm
+    and the first request to each site doesn't wait on DNS
+    
+    Args:
+        urls: Site URLs (only the hostnames are used)
+    
+    Returns:
+        How many hostnames resolved
+    """
+    hosts = {urlparse(u).hostname for u in urls} - {None}
+    
+    def resolve(host: str) -> bool:
+        try:
+            socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+            return True
+        except OSError:                        # Unknown host, no network, etc.: the fetch will report it later
+            return False
+    
+    if not hosts:
+        return 0
+    with ThreadPoolExecutor(max_workers=32) as ex:
+        return sum(ex.map(resolve, hosts))
+
 def scrape_all_news(sites: List[str], per_site_limit: int) -> List[Entry]:
     """
     Scrape articles from all news websites in our list
@@ -977,6 +2040,10 @@ def scrape_all_news(sites: List[str], per_site_limit: int) -> List[Entry]:
     """
     results: List[Entry] = []                  # Initialize empty list to store all articles
     total_sites = len(sites)                   # Get total number of sites for progress tracking
+    
+    # Resolve all site hostnames at once instead of one by one as each site's first request goes out
+    resolved = prefetch_dns(sites)
+    print(f"DNS warmed for {resolved} hosts")
 
     # Parallelize across sites (light concurrency) to speed up total runtime
     def scrape_one(site: str) -> List[Entry]:
@@ -1012,6 +2079,7 @@ def reddit_fetch_subreddit_json(sub: str, max_pages: int) -> List[Dict[str, Any]
         List of dictionaries containing post information
     """
     items: List[Dict[str, Any]] = []           # Initialize empty list to store posts
+    seen_urls: Set[str] = set()                # A post can show up on two pages if the listing shifts while we page
     after: Optional[str] = None                # Reddit pagination token (starts as None)
     
     # Get multiple pages of posts from this subreddit
@@ -1033,7 +2101,7 @@ def reddit_fetch_subreddit_json(sub: str, max_pages: int) -> List[Dict[str, Any]
         
         try:
             # Parse the JSON response from Reddit
-            data = json.loads(jtxt)             # Convert JSON string to Python dictionary
+            data = json_loads(jtxt)            # Convert JSON string to Python dictionary
         except Exception:                      # If JSON parsing failed
             break                              # Stop trying to get more pages
         
@@ -1059,7 +2127,8 @@ def reddit_fetch_subreddit_json(sub: str, max_pages: int) -> List[Dict[str, Any]
                 iso_date = datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
             
             # If we have a valid URL, add this post to our collection
-            if full_url:                       # If we successfully built a URL
+            if full_url and full_url not in seen_urls:  # If we built a URL and don't have this post yet
+                seen_urls.add(full_url)
                 items.append({                 # Add post information to our list
                     "url": full_url,           # The complete URL to the post
                     "title": title,            # The post's title
@@ -1077,6 +2146,13 @@ def reddit_fetch_subreddit_json(sub: str, max_pages: int) -> List[Dict[str, Any]
     
     return items                               # Return all the posts we collected
 
+def reddit_comments_url(host: str, permalink: str) -> str:
+    """
+    JSON URL for a post's comments. depth=1 asks Reddit for top-level comments only: the
+    nested reply trees are most of the payload and parse_comments_json never reads them
+    """
+    return urljoin(host, permalink) + ".json?limit=50&depth=1&raw_json=1"
+
 def reddit_fetch_comments_json(permalink: str, limit: int, session: Optional[requests.Session] = None) -> List[str]:
     """
     Get comments from a specific Reddit post using JSON API
@@ -1096,16 +2172,29 @@ def reddit_fetch_comments_json(permalink: str, limit: int, session: Optional[req
     )
     jtxt = None
     for host in bases:
-        url = urljoin(host, permalink) + ".json?limit=50&raw_json=1"
+        url = reddit_comments_url(host, permalink)
         jtxt = safe_request(url, headers={**DEFAULT_HEADERS, "Accept": "application/json", "Referer": url}, timeout=12, max_retries=4)
         if jtxt:
             break
+    return parse_comments_json(jtxt, limit)
+
+def parse_comments_json(jtxt: Optional[str], limit: int) -> List[str]:
+    """
+    Pull comment texts out of a Reddit post's JSON (as returned by <permalink>.json)
+    
+    Args:
+        jtxt: The downloaded JSON text (None if the download failed)
+        limit: Maximum number of comments to collect
+    
+    Returns:
+        List of comment text strings
+    """
     if not jtxt:                               # If download failed
         return []                              # Return empty list
     
     try:
         # Parse the JSON response from Reddit
-        data = json.loads(jtxt)                # Convert JSON string to Python data structure
+        data = json_loads(jtxt)                # Convert JSON string to Python data structure
     except Exception:                          # If JSON parsing failed
         return []                              # Return empty list
     
@@ -1148,7 +2237,8 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
     """
     all_entries: List[Entry] = []              # Initialize list to store everything we collect
     total_cities = len(city_subreddits)        # Get total number of cities for progress tracking
-    session = build_http_session()             # Shared session for pooling
+    session = _SESSION                         # Shared session for pooling
+    cache = _init_cache(os.path.join("data", "visited.sqlite"))  # Posts whose comments earlier runs collected
     
     # Go through each city and its corresponding subreddit
     for i, (city, sub) in enumerate(city_subreddits.items()): # Loop through city -> subreddit mappings with index
@@ -1172,9 +2262,28 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
                 cities=[city],
             ))
 
-        # Fetch comments for all posts concurrently per subreddit
+        # Fetch comments for all posts concurrently per subreddit, except posts whose comments an
+        # earlier run already collected (this run's own downloads before a restart still count:
+        # the crawl checkpoint serves them)
         permalinks = [(p, p.get("permalink")) for p in posts if p.get("permalink")]
+        resumed = CRAWL_CHECKPOINT.done_urls([reddit_comments_url("https://api.reddit.com", pl) for _, pl in permalinks])
+        permalinks = [(p, pl) for p, pl in permalinks
+                      if reddit_comments_url("https://api.reddit.com", pl) in resumed or not cache_has_reddit(cache, p["url"])]
         comments_by_post: Dict[str, List[str]] = {}
+        if permalinks and aiohttp is not None:
+            # One concurrent pass over the primary endpoint; posts that fail there retry the
+            # other Reddit hosts one by one below
+            urls = [reddit_comments_url("https://api.reddit.com", pl) for _, pl in permalinks]
+            pages = fetch_all(urls, headers={"Accept": "application/json"}, timeout=12, max_retries=4)
+            missed = []
+            for (p, pl), jtxt in zip(permalinks, pages):
+                if jtxt:
+                    comments_by_post[p["url"]] = parse_comments_json(jtxt, comments_per_post_limit)
+                    cache_put_reddit(cache, p["url"])
+                else:
+                    missed.append((p, pl))
+            print(f"    Reddit comments: {len(permalinks) - len(missed)}/{len(permalinks)} posts in one pass")
+            permalinks = missed
         if permalinks:
             with ThreadPoolExecutor(max_workers=16) as ex:
                 futs = {ex.submit(reddit_fetch_comments_json, pl, comments_per_post_limit, session): p for p, pl in permalinks}
@@ -1184,6 +2293,8 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
                         comments_by_post[post["url"]] = fut.result() or []
                     except Exception:
                         comments_by_post[post["url"]] = []
+                    if comments_by_post[post["url"]]:  # Empty can also mean every host failed: try again next run
+                        cache_put_reddit(cache, post["url"])
                     if idx % 10 == 0:
                         print(f"    Reddit comments progress: {idx}/{len(permalinks)} posts")
 
@@ -1200,6 +2311,7 @@ def scrape_reddit_for_cities(city_subreddits: Dict[str, str],
                     cities=[city],
                 ))
             time.sleep(0.01)
+    _flush_cache(cache)                        # Write whatever cache_put_reddit buffered
     
     # Final progress update for Reddit scraping
     print_progress_bar(total_cities, total_cities, f"Scraping Reddit cities")  # Show 100% completion
@@ -1230,15 +2342,26 @@ def detect_cities_in_text(text: str, title: str, nlp, known_cities: Set[str]) ->
     blob = (title + " " + text).lower()        # Merge title and text, make lowercase for consistent matching
     
     # Method 1: Look for city synonyms and nicknames in the text
-    for k, canonical in CITY_SYNONYMS.items():  # Loop through our city synonyms dictionary
-        if k in blob:                          # If this synonym appears anywhere in the text
+    if _CITY_AC is not None:                   # Fast path: one automaton pass finds every synonym
+        for end, (k, canonical) in _CITY_AC.iter(blob):  # Each hit yields (end index, (synonym, canonical city))
+            start = end - len(k) + 1           # Index where the synonym starts
+            # Only whole-word matches count (so "la" inside "plan" is not Los Angeles)
+            if start > 0 and _is_word_char(blob[start - 1]):
+                continue
+            if end + 1 < len(blob) and _is_word_char(blob[end + 1]):
+                continue
             found.add(canonical)               # Add the canonical city name to our results
+    else:
+        for m in CITY_PATTERN.finditer(blob):  # One compiled regex pass over the text
+            found.add(CITY_SYNONYMS[m.group(1).lower()])  # Add the canonical city name to our results
     
     # Method 2: Use AI (spaCy) to find geographic entities
     try:
         # Use spaCy NLP to analyze the text (truncate first to save processing time)
         doc = nlp(truncate_words(title + " " + text, 200))  # Process first 200 words with AI
         
+        known_lower: Optional[Dict[str, str]] = None  # Lowercase name -> city, built on first use
+        
         # Look through all the named entities that spaCy identified
         for ent in doc.ents:                   # Loop through each entity found by AI
             # Check if this entity is a geographic place
@@ -1248,11 +2371,13 @@ def detect_cities_in_text(text: str, title: str, nlp, known_cities: Set[str]) ->
                 # Check if this matches any of our known city synonyms
                 if name in CITY_SYNONYMS:      # If AI found a name that's in our synonyms
                     found.add(CITY_SYNONYMS[name])  # Add the canonical city name
-        else:
-                    # Check if it directly matches any of our known city names
-                    for c in known_cities:     # Loop through our list of cities we care about
-                        if name == c.lower():  # If AI entity matches a known city (case-insensitive)
-                            found.add(c)       # Add this city to our results
+                else:
+                    # Check if it directly matches any of our known city names (case-insensitive)
+                    if known_lower is None:    # One dictionary per call instead of a scan per entity
+                        known_lower = {c.lower(): c for c in known_cities}
+                    c = known_lower.get(name)  # The known city this entity names, if any
+                    if c:
+                        found.add(c)           # Add this city to our results
     except Exception:                          # If NLP processing fails for any reason
         pass                                   # Just continue with what we found from synonym matching
     
@@ -1300,9 +2425,8 @@ def top_keyword_counts(entries: List[Entry], nlp, limit: int) -> List[Tuple[str,
         # Combine title and text, but truncate to save processing time
         text = truncate_words(e.title + " " + e.text, 120)  # Merge title and text, limit to 120 words
         
-        # Extract keywords from this text using AI
-        for kw in extract_candidate_keywords(text, nlp):  # Get keywords from this piece of content
-            counter[kw] += 1                   # Increment the count for this keyword
+        # Extract keywords from this text using AI and count each one (already unique per text)
+        counter.update(extract_candidate_keywords(text, nlp))  # Counter.update does the increments in C
     
     # Return the most common keywords with their counts
     return counter.most_common(limit)          # Get the top 'limit' most frequent keywords
@@ -1311,6 +2435,7 @@ def top_keyword_counts(entries: List[Entry], nlp, limit: int) -> List[Tuple[str,
 # OPENAI INTEGRATION FUNCTIONS
 # =========================
 
+@lru_cache(maxsize=1)                          # Build the client once; every call then shares its connection pool
 def try_get_openai_client():
     """
     Try to create an OpenAI client if we have an API key available
@@ -1378,7 +2503,7 @@ def openai_top_topics(keyword_counts: List[Tuple[str, int]],
         content = resp.choices[0].message.content  # Get the AI's response text
         
         # Parse the JSON response into Python data
-        data = json.loads(content)             # Convert JSON string to Python dictionary
+        data = json_loads(content)             # Convert JSON string to Python dictionary
         
         # Return the topics array from the response
         return data.get("topics", [])          # Get the 'topics' key, or empty list if missing
@@ -1441,7 +2566,7 @@ def openai_score_city(city: str, snippets: List[str]) -> Dict[str, Any]:
         
         # Parse and return the response from OpenAI
         content = resp.choices[0].message.content  # Extract the AI's response text
-        return json.loads(content)             # Parse JSON and return as Python dictionary
+        return json_loads(content)             # Parse JSON and return as Python dictionary
         
     except Exception:                          # If anything goes wrong (API error, JSON parsing, network, etc.)
         # Return default neutral scores as fallback
@@ -1543,8 +2668,17 @@ def main():
                         help="Documents per city fed into AI scoring (fairness normalization)")
     parser.add_argument("--out", type=str, default="data/latest",    # Where to write outputs (JSON/TXT)
                         help="Output directory for results")
+    parser.add_argument("--skip_boundaries", action="store_true",     # Skip the slow Nominatim boundary lookups
+                        help="Do not build city_boundaries.geojson for the map")
+    parser.add_argument("--resume", action="store_true",              # Reuse downloads from an interrupted run
+                        help="Reuse the pages the last unfinished run already downloaded (see CRAWL_RUN_ID)")
     args = parser.parse_args()                                         # Parse the CLI arguments
 
+    if args.resume and not os.getenv("CRAWL_RUN_ID"):                  # An explicit CRAWL_RUN_ID already picks the run
+        resumed_run = CRAWL_CHECKPOINT.resume_latest()
+        print(f"Resuming crawl run {resumed_run}" if resumed_run else "No unfinished crawl run to resume; starting fresh")
+    print(f"Crawl run id: {CRAWL_CHECKPOINT.run_id} (rerun with CRAWL_RUN_ID={CRAWL_CHECKPOINT.run_id} or --resume if interrupted)")
+
     # -----------------------
     # Apply CLI config to globals
     # -----------------------
@@ -1555,6 +2689,9 @@ def main():
     CITY_DOCS_PER_MODEL_CALL = args.city_docs                           # Override per-city AI document cap
 
     # Step 1: Load the AI language model for text processing
+    # spaCy (and sklearn below) are imported here rather than at the top so `--help` and
+    # bad-flag runs don't pay their import time and memory
+    import spacy                                                       # For natural language processing (understanding text)
     nlp = spacy.load("en_core_web_md")                                 # Load spaCy's medium English model with word vectors
     
     # Step 2: Build dynamic city list, subreddits, and news sources (if cities_link provided)
@@ -1578,15 +2715,23 @@ def main():
         city_country_map: Dict[str, Optional[str]] = {c: country for c, country in top_cities}
     else:
         dynamic_sources = NEWS_SOURCES                                   # Fall back to static global sources
+        report_dropped_sources(_LISTED_NEWS_SOURCES, NEWS_SOURCES)       # Repeats removed from the list above
         dynamic_city_subs = CITY_SUBREDDITS                              # Fall back to static subreddit map
         city_country_map: Dict[str, Optional[str]] = {}
 
     # Step 3: Collect data from international/global news sources
+    deduped_sources = dedupe_sources(dynamic_sources)                    # One crawl per site (same host and path = same site)
+    report_dropped_sources(dynamic_sources, deduped_sources)
+    dynamic_sources = deduped_sources
     print_header("Collecting Data")                                      # Print a nice header for this section
-    news_entries = scrape_all_news(dynamic_sources, PER_SOURCE_ARTICLE_LIMIT)  # Scrape all chosen news sites
+    try:
+        news_entries = scrape_all_news(dynamic_sources, PER_SOURCE_ARTICLE_LIMIT)  # Scrape all chosen news sites
+    finally:
+        shutdown_parse_pool()                  # Parsing is done once news scraping is
     
     # Step 4: Collect data from Reddit city communities (dynamic or static map)
     reddit_entries = scrape_reddit_for_cities(dynamic_city_subs, REDDIT_MAX_PAGES, REDDIT_COMMENTS_PER_POST_LIMIT)  # Scrape Reddit
+    CRAWL_CHECKPOINT.finish()                  # Crawl done: a later run starts fresh instead of replaying it
     
     # Step 4: Combine all our collected data into one master list
     all_entries: List[Entry] = news_entries + reddit_entries  # Merge news articles with Reddit posts/comments
@@ -1679,6 +2824,7 @@ def main():
             kw_valid = [keywords[i] for i in valid_idx]  # Get only the valid keywords
             
             # Use clustering algorithm to group similar keywords into 20 topics
+            from sklearn.cluster import AgglomerativeClustering  # Only needed on this fallback path
             clustering = AgglomerativeClustering(n_clusters=20, linkage="average", metric="cosine")  # Create clustering algorithm
             labels = clustering.fit_predict(emb)  # Run clustering on our keyword vectors
             
@@ -1816,7 +2962,7 @@ def main():
 
     # Also build city boundary GeoJSON for the map (best-effort)
     try:
-        if args.cities_link:
+        if args.cities_link and not args.skip_boundaries:
             print("\nBuilding city boundaries (GeoJSON) for map...")
             boundaries_path = os.path.join(out_dir, "city_boundaries.geojson")
             built = build_city_boundaries_geojson(top_cities, boundaries_path)
@@ -1881,8 +3027,8 @@ def main():
         if REDDIT_MAX_PAGES == 0:
             prev_path = os.path.join(out_dir, "full_results.json")
             if os.path.exists(prev_path):
-                with open(prev_path, "r", encoding="utf-8") as pf:
-                    prev = json.load(pf)
+                with open(prev_path, "rb") as pf:
+                    prev = json_loads(pf.read())
                 prev_map = {c.get("name"): c for c in (prev.get("cities") or [])}
                 prev_summary = prev.get("summary") or {}
                 for city in results.get("cities", []):
@@ -1901,6 +3047,7 @@ def main():
                             city["citations"] = []
                         for u in prev_reddit:
                             if u not in existing:
+                                existing.add(u)
                                 city["citations"].append(u)
                 # Update summary counts for reddit if we skipped fetching
                 # Posts: count unique across all city reddit_posts
@@ -1920,8 +3067,7 @@ def main():
     # Write JSON
     out_json = os.path.join(out_dir, "full_results.json")
     try:
-        with open(out_json, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        write_json_file(results, out_json, pretty=True)
         print(f"Saved results JSON -> {out_json}")
     except Exception as e:
         print(f"Failed to save results JSON: {e}")
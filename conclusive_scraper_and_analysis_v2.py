@@ -206,8 +206,11 @@ DEFAULT_HEADERS = {
 # =========================
 
 # Define a data structure to hold information about each article/post/comment
+# __slots__ keeps each entry small (no per-instance __dict__)
 @dataclass
 class Entry:
+    __slots__ = ("source", "source_site", "url", "title", "date", "text", "cities")
+    
     source: str                 # Type of content: 'News', 'RedditPost', or 'RedditComment'
     source_site: str            # Which website it came from (e.g., 'www.nytimes.com' or 'r/nyc')
     url: str                    # The web address of the article/post